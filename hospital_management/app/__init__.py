@@ -73,14 +73,37 @@ def create_app():
     if not os.path.exists(app.config['UPLOAD_FOLDER']):
         os.makedirs(app.config['UPLOAD_FOLDER'])
 
+    # ✅ Database engine: DATABASE_URL switch, pool sizes, SQLite WAL + pragmas
+    from app.services.db_engine import engine_options, init_engine, normalize_database_url
+    app.config['SQLALCHEMY_DATABASE_URI'] = normalize_database_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+
     # ✅ Initialize extensions with app
     db.init_app(app)
+    init_engine(app, db)
     login_manager.init_app(app)
     migrate.init_app(app, db)
 
     # ✅ Import all models so Flask-Migrate recognizes them
     from app.models import user, appointment, report, prediction_result
 
+    # ✅ Prediction history is written in batches by a background thread
+    from app.services.prediction_writer import prediction_writer
+    prediction_writer.init_app(app)
+
+    # ✅ Uploaded reports get their text extracted once, in a process pool
+    from app.services.report_ingest import report_ingestor
+    report_ingestor.init_app(app)
+
+    # ✅ CLI: `flask check-query-plans`, `flask extract-reports`, `flask store-legacy-uploads`, `flask purge-blobs`
+    from app.services.query_plans import check_query_plans_command
+    app.cli.add_command(check_query_plans_command)
+    from app.services.report_ingest import extract_reports_command
+    app.cli.add_command(extract_reports_command)
+    from app.services.storage import purge_blobs_command, store_legacy_uploads_command
+    app.cli.add_command(store_legacy_uploads_command)
+    app.cli.add_command(purge_blobs_command)
+
     # ✅ Register blueprints
     from app.controllers.auth_controller import auth_bp
     from app.controllers.appointment_controller import appointment_bp
@@ -1,14 +1,28 @@
 import os 
 import json
-import requests
-import wave
-import joblib
-import numpy as np
 import re
-
-from flask import Blueprint, request, jsonify, Response
-from werkzeug.utils import secure_filename
-from vosk import Model, KaldiRecognizer
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Blueprint, request, jsonify, render_template, Response, current_app, stream_with_context
+from flask_login import current_user, login_required
+from vosk import Model
+
+from app.services.audio import AudioFormatError, iter_chunks, parse_wav, to_pcm16_mono
+from app.services.speech_pool import PoolSaturated, FutureTimeout, get_speech_pool
+from app.services.speech_stream import StreamClosed, get_stream_registry
+from app.services.symptom_extractor import symptom_lexicon
+from app.services.disease_predictor import get_prediction_batcher, load_predictor
+from app.services.predictor_engine import get_predictor_engine, model_vocabulary, tests_for_disease
+from app.services.prediction_cache import get_prediction_cache
+from app.services.llm_client import LLMError, get_llm_client, normalize_input
+from app.services.symptom_suggester import get_symptom_suggester
+from app.services.docx_render import get_html_cache
+from app.services.pagination import decode_cursor, parse_date, parse_until
+from app.services.prediction_history import (
+    gzip_stream, history_etag, history_page, history_query, stream_history_csv
+)
+from app.services.prediction_writer import prediction_writer
 
 ai_bp = Blueprint('ai', __name__)
 
@@ -36,72 +50,133 @@ def speech_to_text():
     if model is None:
         return jsonify({"error": "Speech model not loaded"}), 500
 
-    if 'audio' not in request.files:
+    # ✅ Read the WAV into memory: raw audio/wav bodies come straight off the
+    # request stream, multipart uploads from the form file object
+    if request.mimetype in ("audio/wav", "audio/x-wav", "audio/wave"):
+        buffer = request.get_data(cache=False)
+    elif 'audio' in request.files:
+        buffer = request.files['audio'].stream.read()
+    else:
         return jsonify({"error": "No audio file provided"}), 400
 
-    import tempfile
-    audio_file = request.files['audio']
-    filename = secure_filename(audio_file.filename)
-    temp_path = os.path.join(tempfile.gettempdir(), filename)
-    audio_file.save(temp_path)
+    try:
+        sample_rate, pcm = to_pcm16_mono(parse_wav(buffer), current_app.config.get("SPEECH_SAMPLE_RATE"))
+    except AudioFormatError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # ✅ Decode on the bounded worker pool instead of this request thread
+    pool = get_speech_pool(model, current_app.config)
+    try:
+        transcript, timing = pool.transcribe(
+            sample_rate, iter_chunks(pcm), timeout=current_app.config.get("SPEECH_TIMEOUT")
+        )
+    except PoolSaturated:
+        response = jsonify({"error": "Speech recognizer is busy, please retry shortly"})
+        response.headers["Retry-After"] = "2"
+        return response, 429
+    except FutureTimeout:
+        return jsonify({"error": "Speech decoding timed out"}), 504
+
+    return jsonify({
+        "transcript": transcript,
+        "detected_symptoms": detect_symptoms(transcript),
+        "timing": timing
+    })
+
+
+# --------------------------------
+# 📡 Streaming Speech-to-Text (raw PCM chunks → partial transcripts)
+# --------------------------------
+def _stream_registry():
+    pool = get_speech_pool(model, current_app.config)
+    return get_stream_registry(pool.recognizers, current_app.config)
+
+
+@ai_bp.route('/ai/speech-to-text/stream', methods=['POST'])
+def speech_stream_open():
+    if model is None:
+        return jsonify({"error": "Speech model not loaded"}), 500
+
+    data = request.get_json(silent=True) or {}
+    try:
+        sample_rate = int(data.get("sample_rate", 16000))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid sample rate"}), 400
+    if not 8000 <= sample_rate <= 96000:
+        return jsonify({"error": "Invalid sample rate"}), 400
+
+    try:
+        stream = _stream_registry().open(sample_rate)
+    except PoolSaturated:
+        response = jsonify({"error": "Too many live dictations, please retry shortly"})
+        response.headers["Retry-After"] = "2"
+        return response, 429
+
+    return jsonify({"stream_id": stream.id, "sample_rate": sample_rate}), 201
 
-    wf = wave.open(temp_path, "rb")
-    if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getcomptype() != "NONE":
-        return jsonify({"error": "Audio must be mono WAV format (PCM)"}), 400
 
-    rec = KaldiRecognizer(model, wf.getframerate())
-    rec.SetWords(True)
+@ai_bp.route('/ai/speech-to-text/stream/<stream_id>', methods=['POST'])
+def speech_stream_chunk(stream_id):
+    stream = _stream_registry().get(stream_id)
+    if stream is None:
+        return jsonify({"error": "Unknown or expired stream"}), 404
 
-    results = []
-    while True:
-        data = wf.readframes(4000)
-        if len(data) == 0:
-            break
-        if rec.AcceptWaveform(data):
-            result = json.loads(rec.Result())
-            results.append(result.get("text", ""))
-    final_result = json.loads(rec.FinalResult())
-    results.append(final_result.get("text", ""))
+    # Body is little-endian 16-bit mono PCM at the stream's sample rate
+    chunk = request.get_data(cache=False)
+    if len(chunk) % 2:
+        return jsonify({"error": "PCM chunk must contain whole 16-bit samples"}), 400
 
-    transcript = " ".join(results).strip().lower()
+    try:
+        transcript, partial = stream.feed(chunk)
+    except StreamClosed:
+        return jsonify({"error": "Unknown or expired stream"}), 404
+    return jsonify({
+        "transcript": transcript,
+        "partial": partial,
+        "detected_symptoms": detect_symptoms(f"{transcript} {partial}")
+    })
 
-    # ✅ Load known symptoms and extract full or multi-word matches
-    known_symptoms = load_or_create_symptom_json(os.path.join(base_dir, "..", "..", "known_symptoms.json"))
 
-    detected_symptoms = []
-    for symptom in known_symptoms:
-        if symptom in transcript:
-            detected_symptoms.append(symptom)
+@ai_bp.route('/ai/speech-to-text/stream/<stream_id>/finish', methods=['POST'])
+def speech_stream_finish(stream_id):
+    transcript = _stream_registry().close(stream_id)
+    if transcript is None:
+        return jsonify({"error": "Unknown or expired stream"}), 404
 
     return jsonify({
         "transcript": transcript,
-        "detected_symptoms": detected_symptoms
+        "detected_symptoms": detect_symptoms(transcript)
     })
 
+
 # --------------------------------
-# 🩺 Create/load known_symptoms.json
+# 📈 Runtime metrics for the AI endpoints
 # --------------------------------
-def load_or_create_symptom_json(file_path):
-    default_symptoms = [
-        "fever", "cough", "headache", "nausea", "vomiting", "fatigue", "chest pain",
-        "rash", "sore throat", "body pain", "diarrhea", "shortness of breath",
-        "dizziness", "cold", "sneezing", "throat pain", "chest pain", "pain", "migraine", "weakness",
-        "itching", "swelling", "runny nose", "loss of appetite", "weight loss",
-        "night sweats", "abdominal pain", "joint pain", "blurred vision", "irritation",
-        "muscle ache", "burning sensation", "tingling", "loss of taste", "loss of smell",
-        "palpitations", "frequent urination", "dry mouth", "difficulty breathing","tired",
-        "yellowing of skin", "dehydration", "congestion", "chills", "bleeding", "insomnia"
-    ]
+@ai_bp.route('/ai/metrics', methods=['GET'])
+def ai_metrics():
+    metrics = {}
+    if model is not None:
+        metrics["speech"] = get_speech_pool(model, current_app.config).snapshot()
+        metrics["speech"]["live_streams"] = len(_stream_registry())
+    batcher = get_prediction_batcher(predictor, current_app.config) if predictor else None
+    if batcher is not None:
+        metrics["prediction_batching"] = batcher.snapshot()
+    metrics["predictor_backend"] = prediction_engine().name
+    metrics["prediction_writer"] = prediction_writer.snapshot()
+    metrics["prediction_cache"] = get_prediction_cache(current_app.config).snapshot()
+    metrics["symptom_suggester"] = get_symptom_suggester(current_app.config).snapshot()
+    metrics["llm_suggest"] = dict(_llm_stats, slots=LLM_SUGGEST_SLOTS)
+    metrics["report_html_cache"] = get_html_cache(current_app.config).snapshot()
+    if OPENROUTER_API_KEY:
+        metrics["llm"] = get_llm_client(OPENROUTER_API_KEY, current_app.config).snapshot()
+    return jsonify(metrics)
 
-    if not os.path.exists(file_path):
-        with open(file_path, "w") as f:
-            json.dump(default_symptoms, f, indent=4)
-        print(f"[INFO] Created new known_symptoms.json with {len(default_symptoms)} symptoms.")
 
-    with open(file_path, "r") as f:
-        symptoms = json.load(f)
-
-    return set(symptoms)
+# --------------------------------
+# 🩺 Symptom detection (compiled lexicon, rebuilt when known_symptoms.json changes)
+# --------------------------------
+def detect_symptoms(transcript):
+    return symptom_lexicon.extract(transcript)
 
 
 # --------------------------------
@@ -115,45 +190,73 @@ def is_medical_like_input(text):
 # --------------------------------
 # 2️⃣ Symptom Suggestion via GPT-3.5
 # --------------------------------
-def suggest_symptoms_from_llm(input_text):
-    if not OPENROUTER_API_KEY:
-        return ["Missing OpenRouter API key"]
-
-    if not is_medical_like_input(input_text):
-        return ["Please enter valid medical symptoms."]
-
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "http://localhost",
-        "X-Title": "Hospital-AI-Assistant"
-    }
-
-    prompt = (
+def build_suggestion_prompt(input_text):
+    return (
         "You are a smart medical assistant.\n"
         f"A patient is having these symptoms \"{input_text}\" what are other possible symptoms he have: \n\n"
         "List 5 unique possible medical symptoms they might be referring to, one per line."
     )
 
-    payload = {
-        "model": "openai/gpt-3.5-turbo",
-        "messages": [{"role": "user", "content": prompt}]
-    }
 
-    try:
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload)
-        if response.status_code != 200:
-            return [f"OpenRouter Error: {response.status_code}"]
-
-        content = response.json()["choices"][0]["message"]["content"]
-        suggestions = [
-            re.sub(r"^\W*\d*\W*", "", line.strip().lower())
-            for line in content.split("\n") if line.strip()
-        ]
-        return suggestions if suggestions else ["No symptoms identified"]
+def clean_suggestion_line(line):
+    return re.sub(r"^\W*\d*\W*", "", line.strip().lower())
+
+
+def fetch_llm_suggestions(input_text, config):
+    """Ask the LLM for related symptoms; raises LLMError when it cannot answer."""
+    client = get_llm_client(OPENROUTER_API_KEY, config)
+    content = client.complete(build_suggestion_prompt(input_text), cache_key=normalize_input(input_text))
+    return [
+        clean_suggestion_line(line)
+        for line in content.split("\n") if line.strip()
+    ]
+
+
+# --------------------------------
+# 🧮 Local co-occurrence suggestions (offline fallback)
+# --------------------------------
+# LLM calls run here so a request can stop waiting after SUGGEST_LLM_BUDGET;
+# an abandoned call still finishes and warms the client cache for next time.
+# Calls in flight (abandoned ones included) hold a slot: with every slot taken,
+# e.g. during an LLM outage, requests go straight to the local suggestions
+# instead of queueing behind calls that will also miss their budget.
+LLM_SUGGEST_SLOTS = 8
+_llm_executor = ThreadPoolExecutor(max_workers=LLM_SUGGEST_SLOTS, thread_name_prefix="llm-suggest")
+_llm_slots = threading.BoundedSemaphore(LLM_SUGGEST_SLOTS)
+_llm_stats = {"skipped_saturated": 0}
+
+
+def local_suggestions(input_text):
+    return get_symptom_suggester(current_app.config).suggest_for_text(input_text)
+
 
+def llm_suggestions_within_budget(input_text):
+    """Return (suggestions, error); suggestions is None when the LLM is unavailable or too slow."""
+    if not OPENROUTER_API_KEY:
+        return None, "Missing OpenRouter API key"
+
+    config = current_app.config
+    cached = get_llm_client(OPENROUTER_API_KEY, config).cached(normalize_input(input_text))
+    if cached is not None:
+        return [clean_suggestion_line(line) for line in cached.split("\n") if line.strip()], None
+
+    if not _llm_slots.acquire(blocking=False):
+        _llm_stats["skipped_saturated"] += 1
+        return None, "LLM busy; using local suggestions"
+    try:
+        future = _llm_executor.submit(fetch_llm_suggestions, input_text, config)
+    except Exception:
+        _llm_slots.release()
+        raise
+    future.add_done_callback(lambda _: _llm_slots.release())
+    try:
+        return future.result(timeout=config.get("SUGGEST_LLM_BUDGET", 4)) or None, None
+    except FutureTimeout:
+        return None, "LLM exceeded the latency budget"
+    except LLMError as e:
+        return None, str(e)
     except Exception as e:
-        return [f"Error parsing LLM output: {str(e)}"]
+        return None, f"Error parsing LLM output: {str(e)}"
 
 
 # --------------------------------
@@ -171,136 +274,290 @@ def symptom_suggest():
             "error": "Please enter valid medical symptom keywords."
         }), 400
 
-    related = suggest_symptoms_from_llm(input_text)
-    return jsonify({
+    local = local_suggestions(input_text)
+    related, llm_error = llm_suggestions_within_budget(input_text)
+    response = {
         "input_text": input_text,
-        "related_symptoms": related
-    })
+        "detected_symptoms": detect_symptoms(input_text),
+        "related_symptoms": related if related is not None else local,
+        "local_symptoms": local,
+        "source": "llm" if related is not None else "local"
+    }
+    if llm_error:
+        response["llm_error"] = llm_error
+    return jsonify(response)
+
+
+# --------------------------------
+# 📡 Streaming Symptom Suggestions (Server-Sent Events)
+# --------------------------------
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# POST, not EventSource's GET: symptom text must stay out of URLs, access logs and history
+@ai_bp.route('/ai/symptom-suggest/stream', methods=['POST'])
+def symptom_suggest_stream():
+    data = request.get_json(silent=True) or {}
+    input_text = data.get("input_text", "")
+
+    def generate():
+        if not input_text or not is_medical_like_input(input_text):
+            yield sse_event("error", {"error": "Please enter valid medical symptom keywords."})
+            return
+
+        yield sse_event("detected", {"detected_symptoms": detect_symptoms(input_text)})
+
+        # ✅ Local co-occurrence suggestions go out first, before any network call
+        sent = set()
+        for symptom in local_suggestions(input_text):
+            sent.add(symptom)
+            yield sse_event("symptom", {"symptom": symptom, "source": "local"})
+
+        if not OPENROUTER_API_KEY:
+            if not sent:
+                yield sse_event("error", {"error": "Missing OpenRouter API key"})
+                return
+            yield sse_event("done", {})
+            return
+
+        client = get_llm_client(OPENROUTER_API_KEY, current_app.config)
+        cache_key = normalize_input(input_text)
+        cached = client.cached(cache_key)
+        # ✅ Forward each suggestion as soon as its line is complete
+        pieces = [cached] if cached is not None else client.stream(build_suggestion_prompt(input_text), cache_key)
+
+        buffer = ""
+        try:
+            for piece in pieces:
+                buffer += piece
+                *lines, buffer = buffer.split("\n")
+                for line in lines:
+                    symptom = clean_suggestion_line(line)
+                    if symptom and symptom not in sent:
+                        sent.add(symptom)
+                        yield sse_event("symptom", {"symptom": symptom, "source": "llm"})
+            symptom = clean_suggestion_line(buffer)
+            if symptom and symptom not in sent:
+                yield sse_event("symptom", {"symptom": symptom, "source": "llm"})
+        except Exception as e:
+            # The local suggestions already sent still stand on their own
+            if not sent:
+                message = str(e) if isinstance(e, LLMError) else f"Error parsing LLM output: {str(e)}"
+                yield sse_event("error", {"error": message})
+                return
+
+        yield sse_event("done", {})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+    )
 
 
 # --------------------------------------------
-# 4️⃣ Disease & Lab Test Prediction (ML Model)
+# 4️⃣ Disease & Lab Test Prediction (forest / rules / ensemble engine)
 # --------------------------------------------
 ml_model_path = os.path.join(base_dir, "..", "..", "disease_model.joblib")
 encoder_path = os.path.join(base_dir, "..", "..", "symptom_encoder.joblib")
+compiled_model_path = os.path.join(base_dir, "..", "..", "disease_forest.bin")
+
+predictor = load_predictor(ml_model_path, encoder_path, compiled_model_path)
+
+# ✅ Compile the symptom lexicon once at startup, with the models' own symptoms
+# reserved first so normalization never changes after the first prediction
+symptom_lexicon.reserve(model_vocabulary(predictor))
+symptom_lexicon.automaton()
+
+def prediction_engine():
+    return get_predictor_engine(predictor, current_app.config)
 
-ml_model = joblib.load(ml_model_path) if os.path.exists(ml_model_path) else None
-symptom_encoder = joblib.load(encoder_path) if os.path.exists(encoder_path) else None
 
 @ai_bp.route('/ai/predict-disease', methods=['POST'])
 def predict_disease():
-    data = request.get_json()
-    symptoms = data.get("symptoms", [])
+    # Accept JSON or form-encoded data (form posts carry a JSON list in 'symptoms')
+    if request.is_json:
+        data = request.get_json()
+        symptoms = data.get("symptoms", [])
+    else:
+        raw = request.form.get('symptoms', '')
+        try:
+            symptoms = json.loads(raw) if raw else []
+        except ValueError:
+            return jsonify({"error": "Invalid symptom format"}), 400
     print("[🩺] Received symptoms from frontend:", symptoms)
 
-    if not ml_model or not symptom_encoder:
-        return jsonify({"error": "ML model or encoder not loaded"}), 500
-
     if not symptoms or not isinstance(symptoms, list):
         return jsonify({"error": "No symptoms provided or invalid format"}), 400
 
+    engine = prediction_engine()
     try:
-        valid_symptoms = symptom_encoder.classes_.tolist()
-        cleaned = [s for s in symptoms if s in valid_symptoms]
+        cleaned, _ = engine.split_known(engine.normalize(symptoms))
         print("[✅] Cleaned valid symptoms:", cleaned)
 
         if not cleaned:
-            return jsonify({"error": "No valid symptoms found. Valid symptoms are: " + ', '.join(valid_symptoms)}), 400
+            return jsonify({"error": "No valid symptoms found. Valid symptoms are: " + ', '.join(engine.symptoms)}), 400
 
-        encoded = symptom_encoder.transform([cleaned])
-        prediction = ml_model.predict(encoded)[0]
-        disease = prediction
-        tests = get_tests_for_disease(disease)
+        # ✅ One path for every backend; repeated symptom sets come from the shared cache
+        disease, tests = engine.predict(cleaned)
 
         save_prediction_history(cleaned, disease, tests)
 
-        return jsonify({
-            "disease": disease,
-            "tests": tests
-        })
-
     except Exception as e:
         print("[⚠️] Prediction Error:", str(e))
         return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
 
+    if not request.is_json:
+        return render_template("symptom_suggest.html", disease=disease, tests=tests)
 
-# --------------------------------------------
-# 🧪 Map Diseases to Recommended Lab Tests
-# --------------------------------------------
-def get_tests_for_disease(disease):
-    mapping = {
-        "influenza": ["CBC", "Influenza Test", "Chest X-Ray"],
-        "migraine": ["CT Scan", "MRI", "Neurological Exam"],
-        "dengue": ["Dengue NS1 Antigen", "Platelet Count", "CBC"],
-        "heart attack": ["ECG", "Troponin Test", "Chest X-ray"],
-        "food poisoning": ["Stool Culture", "Electrolyte Test"],
-        "malaria": ["Blood Smear", "Rapid Diagnostic Test"],
-        "common cold": ["Physical Exam", "CBC"],
-        "sciatica": ["X-ray", "MRI", "Nerve Conduction Study"],
-        "chikungunya": ["ELISA", "CBC", "Liver Function Test"]
-    }
-    return mapping.get(disease.lower(), ["Consult General Physician"])
+    return jsonify({
+        "disease": disease,
+        "tests": tests
+    })
 
 
 # --------------------------------------------
-# 💾 Save Prediction History to JSON
+# 📦 Batch Disease Prediction (one predict_proba for N symptom sets)
 # --------------------------------------------
-def save_prediction_history(symptoms, disease, tests):
-    history_file = os.path.join(base_dir, "..", "..", "prediction_history.json")
-    try:
-        if os.path.exists(history_file):
-            with open(history_file, "r") as f:
-                data = json.load(f)
+@ai_bp.route('/ai/predict-disease/batch', methods=['POST'])
+def predict_disease_batch():
+    engine = prediction_engine()
+    data = request.get_json(silent=True) or {}
+    records = data.get("records")
+    if not isinstance(records, list) or not records:
+        return jsonify({"error": "Provide 'records' as a non-empty list of symptom lists"}), 400
+
+    max_rows = current_app.config.get("PREDICT_BATCH_MAX_ROWS", 10000)
+    if len(records) > max_rows:
+        return jsonify({"error": f"Too many records (max {max_rows} per request)"}), 413
+
+    top_k = data.get("top_k", 3)
+    if isinstance(top_k, str) and top_k.strip().isdigit():
+        top_k = int(top_k)
+    if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+        return jsonify({"error": "top_k must be a positive integer"}), 400
+
+    # Each record is either a symptom list or {"id": ..., "symptoms": [...]}
+    results, to_predict = [], []
+    for record in records:
+        record_id, symptoms = None, record
+        if isinstance(record, dict):
+            record_id, symptoms = record.get("id"), record.get("symptoms")
+        if not isinstance(symptoms, list):
+            results.append({"id": record_id, "error": "Invalid symptom format", "predictions": []})
+            continue
+
+        known, unknown = engine.split_known(engine.normalize(symptoms))
+        result = {"id": record_id, "symptoms": known, "unknown_symptoms": unknown, "predictions": []}
+        if known:
+            to_predict.append((result, known))
         else:
-            data = []
+            result["error"] = "No valid symptoms found"
+        results.append(result)
+
+    try:
+        ranked = engine.predict_top_k([known for _, known in to_predict], k=top_k)
+    except Exception as e:
+        print("[⚠️] Batch Prediction Error:", str(e))
+        return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
 
-        data.append({
-            "symptoms": symptoms,
-            "disease": disease,
-            "tests": tests
-        })
+    for (result, _), top in zip(to_predict, ranked):
+        result["predictions"] = [
+            {"disease": disease, "probability": round(probability, 4), "tests": tests_for_disease(disease)}
+            for disease, probability in top
+        ]
 
-        with open(history_file, "w") as f:
-            json.dump(data, f, indent=4)
+    return jsonify({"count": len(results), "results": results})
 
-    except Exception as e:
-        print("[ERROR] Failed to save prediction history:", str(e))
+
+# --------------------------------------------
+# 💾 Save Prediction History (prediction_results table, batched in the background)
+# --------------------------------------------
+def save_prediction_history(symptoms, disease, tests):
+    user_id = current_user.id if current_user.is_authenticated else None
+    # ✅ Queued for the background writer; the response never waits on a commit
+    if not prediction_writer.submit(symptoms, disease, tests, user_id=user_id):
+        print("[ERROR] Prediction history queue full; result not saved.")
 
 
 # --------------------------------------------
 # 📊 Get Prediction History Endpoint
 # --------------------------------------------
+def history_owner():
+    """Admins see everyone's history (optionally ?user_id=); other users only their own."""
+    if current_user.role == 'admin':
+        return request.args.get('user_id', type=int)
+    return current_user.id
+
+
 @ai_bp.route('/ai/prediction-history', methods=['GET'])
+@login_required
 def prediction_history():
-    history_file = os.path.join(base_dir, "..", "..", "prediction_history.json")
-    if not os.path.exists(history_file):
-        return jsonify([])
+    user_id = history_owner()
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+    cursor = None
+    if request.args.get('cursor'):
+        cursor = decode_cursor(request.args['cursor'])
+        if cursor is None:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    # ✅ Unchanged pages short-circuit to 304 before touching the rows
+    etag = history_etag(dict(request.args.to_dict(), user_id=user_id))
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    query = history_query(
+        user_id=user_id,
+        disease=request.args.get('disease'),
+        symptom=request.args.get('symptom'),
+        since=parse_date(request.args.get('from')),
+        until=parse_until(request.args.get('to')),
+    )
+    results, next_cursor = history_page(query, cursor, limit)
 
-    with open(history_file, "r") as f:
-        data = json.load(f)
-    return jsonify(data)
+    response = jsonify({
+        "items": [result.to_dict() for result in results],
+        "next_cursor": next_cursor
+    })
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
 
 
 # --------------------------------------------
 # 📥 Export History as CSV Endpoint
 # --------------------------------------------
 @ai_bp.route('/ai/export-history', methods=['GET'])
+@login_required
 def export_prediction_history():
-    history_file = os.path.join(base_dir, "..", "..", "prediction_history.json")
-    if not os.path.exists(history_file):
+    query = history_query(
+        user_id=history_owner(),
+        disease=request.args.get('disease'),
+        symptom=request.args.get('symptom'),
+        since=parse_date(request.args.get('from')),
+        until=parse_until(request.args.get('to')),
+    )
+    if query.first() is None:
         return jsonify({"error": "No history found"}), 404
 
-    with open(history_file, 'r') as f:
-        data = json.load(f)
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    rows = stream_history_csv(query)
 
-    def generate_csv():
-        output = "symptoms,disease,tests\n"
-        for record in data:
-            output += f"{';'.join(record['symptoms'])},{record['disease']},{';'.join(record['tests'])}\n"
-        return output
+    # ✅ Rows are streamed from the DB in chunks, so memory stays flat and the download starts at once
+    if compress:
+        return Response(
+            stream_with_context(gzip_stream(rows)),
+            mimetype='application/gzip',
+            headers={"Content-Disposition": "attachment;filename=prediction_history.csv.gz",
+                     "Cache-Control": "private, no-store"}
+        )
 
     return Response(
-        generate_csv(),
+        stream_with_context(rows),
         mimetype='text/csv',
-        headers={"Content-Disposition": "attachment;filename=prediction_history.csv"}
+        headers={"Content-Disposition": "attachment;filename=prediction_history.csv",
+                 "Cache-Control": "private, no-store"}
     )
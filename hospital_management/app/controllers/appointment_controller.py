@@ -3,6 +3,8 @@ from flask_login import login_required, current_user
 from app.models.appointment import Appointment
 from app.models.user import User
 from app import db
+from app.services.appointment_listing import STATUSES, appointment_page, appointment_query
+from app.services.pagination import decode_cursor, parse_date, parse_until
 from datetime import datetime
 
 appointment_bp = Blueprint('appointment', __name__)
@@ -36,16 +38,28 @@ def create_appointment():
 @appointment_bp.route('/view_appointments')
 @login_required
 def view_appointments():
-    if current_user.role == 'admin':
-        appointments = Appointment.query.all()
-    elif current_user.role == 'doctor':
-        appointments = Appointment.query.filter_by(doctor_id=current_user.id).all()
-    elif current_user.role == 'patient':
-        appointments = Appointment.query.filter_by(patient_id=current_user.id).all()
+    status = request.args.get('status', 'all')
+    if status not in STATUSES:
+        status = 'all'
+    since = parse_date(request.args.get('from'))
+    until = parse_until(request.args.get('to'))
+    limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+    cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+
+    # ✅ One SELECT per page: doctor/patient names are joined in, only listed columns are loaded
+    query = appointment_query(current_user, status=status, since=since, until=until)
+    if query is None:
+        appointments, next_cursor = [], None
     else:
-        appointments = []
-
-    return render_template('view_appointments.html', appointments=appointments)
+        appointments, next_cursor = appointment_page(query, cursor, limit, ascending=(status == 'upcoming'))
+
+    filters = {
+        'status': status,
+        'from': request.args.get('from', ''),
+        'to': request.args.get('to', ''),
+    }
+    return render_template('view_appointments.html', appointments=appointments,
+                           next_cursor=next_cursor, filters=filters, statuses=STATUSES)
 
 
 
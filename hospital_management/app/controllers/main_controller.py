@@ -1,8 +1,6 @@
-from flask import Blueprint, flash, redirect, render_template, request, url_for, jsonify, session
-import json
+from flask import Blueprint, flash, redirect, render_template, request, url_for, session
 from flask_login import current_user, login_required
-from app import db
-from app.models.prediction_result import PredictionResult
+from app.services.symptom_extractor import symptom_lexicon
 
 main_bp = Blueprint('main', __name__)
 
@@ -39,9 +37,17 @@ def save_symptoms():
     # Combine and clean symptoms
     all_symptoms = []
     if manual_symptoms:
-        all_symptoms.extend([s.strip().lower() for s in manual_symptoms.split(',') if s.strip()])
+        for entry in manual_symptoms.split(','):
+            entry = entry.strip().lower()
+            if not entry:
+                continue
+            canonical = symptom_lexicon.normalize(entry)
+            all_symptoms.append(canonical)
+            if canonical == entry:
+                # Free text like "fever and a stuffy nose" also yields each known symptom in it
+                all_symptoms.extend(symptom_lexicon.extract(entry))
     if selected_symptoms:
-        all_symptoms.extend([s.strip().lower() for s in selected_symptoms])
+        all_symptoms.extend([symptom_lexicon.normalize(s.strip().lower()) for s in selected_symptoms])
 
     all_symptoms = list(set(all_symptoms))  # remove duplicates
 
@@ -94,84 +100,3 @@ def predict_disease_page():
     all_symptoms = sorted(set(default_symptoms + user_symptoms))
 
     return render_template("symptom_predict.html", symptoms=all_symptoms)
-
-
-# -----------------------------------------------------
-# 🧠 Unified Endpoint: Predict Disease (Rule-Based)
-# -----------------------------------------------------
-@main_bp.route('/ai/predict-disease', methods=['POST'])
-@login_required
-def predict_disease_api():
-    # Accept JSON or form-encoded data
-    if request.is_json:
-        data = request.get_json()
-        symptoms = data.get('symptoms', [])
-    else:
-        raw = request.form.get('symptoms', '')
-        try:
-            symptoms = json.loads(raw) if raw else []
-        except Exception:
-            return jsonify({"error": "Invalid symptom format"}), 400
-
-    if not symptoms:
-        return jsonify({"error": "No symptoms provided"}), 400
-
-    print("Symptoms received for prediction:", symptoms)
-
-    # 🧠 Rule-Based Disease Prediction
-    disease_map = {
-        "fever": ["Flu", "Dengue", "Malaria"],
-        "cough": ["Common Cold", "Bronchitis", "COVID-19"],
-        "headache": ["Migraine", "Tension headache", "Flu"],
-        "rash": ["Allergy", "Chickenpox", "Measles"],
-        "nausea": ["Food Poisoning", "Gastritis"],
-        "fatigue": ["Anemia", "Hypothyroidism"],
-        "chest pain": ["Heart Attack", "Angina"],
-        "diarrhea": ["Food Poisoning", "Cholera"]
-    }
-
-    predicted_diseases = set()
-    for symptom in symptoms:
-        predicted_diseases.update(disease_map.get(symptom.lower(), []))
-
-    disease = sorted(predicted_diseases)[0] if predicted_diseases else None
-
-    # 🧪 Suggested Tests
-    lab_tests_map = {
-        "Flu": ["CBC", "Influenza Test"],
-        "Dengue": ["Dengue NS1 Antigen", "CBC"],
-        "Malaria": ["Peripheral Blood Smear", "Rapid Diagnostic Test"],
-        "Common Cold": [],
-        "Bronchitis": ["Chest X-Ray"],
-        "COVID-19": ["RT-PCR", "Antigen Test"],
-        "Migraine": [],
-        "Tension headache": [],
-        "Allergy": ["Allergy Test"],
-        "Chickenpox": ["Varicella-Zoster Virus Test"],
-        "Measles": ["Measles Antibody Test"],
-        "Food Poisoning": ["Stool Culture"],
-        "Gastritis": ["Endoscopy"],
-        "Anemia": ["CBC", "Iron Studies"],
-        "Hypothyroidism": ["TSH Test"],
-        "Heart Attack": ["ECG", "Troponin Test"],
-        "Angina": ["ECG", "Stress Test"],
-        "Cholera": ["Stool Test"]
-    }
-
-    tests = lab_tests_map.get(disease, []) if disease else []
-
-    # ✅ Save result to DB
-    new_result = PredictionResult(
-        user_id=current_user.id,
-        symptoms=",".join(symptoms),
-        disease=disease,
-        tests=",".join(tests)
-    )
-    db.session.add(new_result)
-    db.session.commit()
-
-    # Return as JSON or render UI
-    if request.is_json:
-        return jsonify({"disease": disease, "tests": tests})
-
-    return render_template("symptom_suggest.html", disease=disease, tests=tests)
\ No newline at end of file
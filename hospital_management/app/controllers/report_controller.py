@@ -1,11 +1,21 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, send_from_directory, current_app
+from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, make_response, Response
 from flask_login import login_required, current_user
-from werkzeug.utils import secure_filename
+import mimetypes
 import os
 from app import db
 from app.models.report import MedicalReport
-from docx import Document
-from math import ceil
+from app.services.report_ingest import report_ingestor
+from app.services.pagination import decode_cursor
+from app.services.report_search import (
+    approximate_total, index_report, report_page, report_query, unindex_report
+)
+from app.services.docx_render import RENDER_VERSION, get_html_cache
+from app.services.file_delivery import deliver_file
+from app.services.storage import (
+    get_storage, purge_blob, release_blob, report_file_exists, report_local_path, store_report_file
+)
+from datetime import datetime, timezone
+from markupsafe import Markup, escape
 
 report_bp = Blueprint('report', __name__)  # ✅ Fix: __name__ instead of _name_
 
@@ -27,20 +37,29 @@ def upload_report():
             return redirect(request.url)
 
         if allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-
-            # Optional: prevent overwriting existing file
-            if os.path.exists(filepath):
-                flash("A file with this name already exists.", "danger")
+            # Keep the name the user chose; the bytes are stored by content hash
+            filename = os.path.basename(file.filename.replace('\\', '/'))[:255] or 'report'
+            new_report = MedicalReport(
+                user_id=current_user.id, filename=filename,
+                content_type=mimetypes.guess_type(filename)[0] or file.mimetype,
+            )
+
+            # ✅ Streamed to a temp file while hashing; identical files are stored once (refcounted)
+            try:
+                store_report_file(new_report, file.stream, get_storage(current_app.config))
+            except Exception as e:
+                db.session.rollback()
+                print("[ERROR] Could not store report:", str(e))
+                flash("Could not store the report, please try again.", "danger")
                 return redirect(request.url)
-
-            file.save(filepath)
-
-            new_report = MedicalReport(user_id=current_user.id, filename=filename)
             db.session.add(new_report)
+            db.session.flush()
+            index_report(new_report)
             db.session.commit()
 
+            # ✅ Text extraction + symptom detection run in the background process pool
+            report_ingestor.submit(new_report)
+
             flash("Report uploaded successfully!", "success")
             return redirect(url_for('report.view_reports'))
         else:
@@ -57,59 +76,18 @@ def upload_report():
 @login_required
 def view_reports():
     search_query = request.args.get('search', '').strip()
-    page = request.args.get('page', 1, type=int)
     per_page = 5
+    cursor = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
 
-    if current_user.role == 'admin':
-        query = MedicalReport.query
-    else:
-        query = MedicalReport.query.filter_by(user_id=current_user.id)
-
-    if search_query:
-        query = query.filter(MedicalReport.filename.ilike(f"%{search_query}%"))
-
-    total_reports = query.count()
-    reports = query.order_by(MedicalReport.upload_date.desc()) \
-                   .offset((page - 1) * per_page) \
-                   .limit(per_page).all()
-
-    class Pagination:
-        def __init__(self, page, per_page, total):  # ✅ Fix: correct __init__
-            self.page = page
-            self.per_page = per_page
-            self.total = total
-            self.pages = ceil(total / per_page)
-
-        @property
-        def has_prev(self):
-            return self.page > 1
+    user_id = None if current_user.role == 'admin' else current_user.id
 
-        @property
-        def has_next(self):
-            return self.page < self.pages
+    # ✅ Search goes through the FTS5 trigram index; pages are keyset, not OFFSET
+    query = report_query(user_id, search_query)
+    reports, next_cursor = report_page(query, cursor, per_page)
+    total_reports = approximate_total(user_id, search_query)
 
-        @property
-        def prev_num(self):
-            return self.page - 1
-
-        @property
-        def next_num(self):
-            return self.page + 1
-
-        def iter_pages(self, left_edge=2, right_edge=2, left_current=2, right_current=2):
-            last = 0
-            for num in range(1, self.pages + 1):
-                if (num <= left_edge or
-                    (num >= self.page - left_current and num <= self.page + right_current) or
-                    num > self.pages - right_edge):
-                    if last + 1 != num:
-                        yield None
-                    yield num
-                    last = num
-
-    pagination = Pagination(page, per_page, total_reports)
-
-    return render_template('view_reports.html', reports=reports, search_query=search_query, pagination=pagination)
+    return render_template('view_reports.html', reports=reports, search_query=search_query,
+                           next_cursor=next_cursor, total_reports=total_reports)
 
 
 # ------------------------
@@ -124,24 +102,75 @@ def delete_report(report_id):
         flash("You are not authorized to delete this report.", "danger")
         return redirect(url_for('report.view_reports'))
 
+    storage_key, filename = report.storage_key, report.filename
+    unindex_report(report.id)
+    db.session.delete(report)
+    unreferenced = False
     try:
-        os.remove(os.path.join(current_app.config['UPLOAD_FOLDER'], report.filename))
+        unreferenced = bool(storage_key) and release_blob(storage_key)
+        db.session.commit()
     except Exception as e:
+        db.session.rollback()
         flash(f"Error deleting file: {e}", "danger")
+        return redirect(url_for('report.view_reports'))
+
+    # ✅ The blob goes only after the delete is committed, and only when no other report points at it
+    if unreferenced:
+        try:
+            purge_blob(storage_key, get_storage(current_app.config))
+        except Exception as e:
+            # Left as an orphan for `flask purge-blobs`; the report itself is gone
+            print(f"[ERROR] Could not remove stored blob {storage_key}: {e}")
+
+    if not storage_key:
+        try:
+            os.remove(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+        except Exception as e:
+            flash(f"Error deleting file: {e}", "danger")
 
-    db.session.delete(report)
-    db.session.commit()
     flash("Report deleted successfully.", "success")
     return redirect(url_for('report.view_reports'))
 
 
+def authorized_report(report_id):
+    """The report if the current user may read it, else None."""
+    report = db.session.get(MedicalReport, report_id)
+    if report is None or (report.user_id != current_user.id and current_user.role != 'admin'):
+        return None
+    return report
+
+
+def send_report(report, as_attachment):
+    storage = get_storage(current_app.config)
+    path = report_local_path(report, storage, current_app.config['UPLOAD_FOLDER'])
+    # ✅ Only reached after the authorization check; the proxy may serve the bytes
+    return deliver_file(
+        current_app.config,
+        path=path,
+        stream=storage.open(report.storage_key) if path is None else None,
+        mimetype='application/pdf' if report.extension == 'pdf' else report.content_type,
+        download_name=report.filename,
+        as_attachment=as_attachment,
+        size=report.size,
+        etag=report.sha256,
+        last_modified=report.upload_date if report.storage_key else None,
+    )
+
+
 # ------------------------
 # Download Report
 # ------------------------
-@report_bp.route('/download_report/<filename>')
+@report_bp.route('/download_report/<int:report_id>')
 @login_required
-def download_report(filename):
-    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename, as_attachment=True)
+def download_report(report_id):
+    report = authorized_report(report_id)
+    if not report:
+        flash("You are not authorized to download this report.", "danger")
+        return redirect(url_for('report.view_reports'))
+    if not report_file_exists(report, get_storage(current_app.config), current_app.config['UPLOAD_FOLDER']):
+        flash("Report file not found.", "danger")
+        return redirect(url_for('report.view_reports'))
+    return send_report(report, as_attachment=True)
 
 
 # ------------------------
@@ -149,37 +178,61 @@ def download_report(filename):
 # ------------------------
 from flask import render_template_string
 
-@report_bp.route('/view_report/<filename>')
+@report_bp.route('/view_report/<int:report_id>')
 @login_required
-def view_report(filename):
-    file_ext = filename.rsplit('.', 1)[1].lower()
-    file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-
+def view_report(report_id):
     # Authorization check
-    if current_user.role != 'admin':
-        report = MedicalReport.query.filter_by(filename=filename, user_id=current_user.id).first()
-        if not report:
-            flash("You are not authorized to view this report.", "danger")
-            return redirect(url_for('report.view_reports'))
+    report = authorized_report(report_id)
+    if not report:
+        flash("You are not authorized to view this report.", "danger")
+        return redirect(url_for('report.view_reports'))
 
-    if not os.path.exists(file_path):
+    storage = get_storage(current_app.config)
+    if not report_file_exists(report, storage, current_app.config['UPLOAD_FOLDER']):
         flash("Report file not found.", "danger")
         return redirect(url_for('report.view_reports'))
 
-    if file_ext == 'docx':
+    if report.extension == 'docx':
+        # ✅ Rendered once per file version; browsers revalidate with ETag / Last-Modified
         try:
-            doc = Document(file_path)
-            html_content = ''.join(f'<p>{para.text}</p>' for para in doc.paragraphs if para.text.strip())
-            return render_template_string("""
-                <!DOCTYPE html>
-                <html><body>{{ content|safe }}</body></html>
-            """, content=html_content)
+            response = render_docx_report(report, storage)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response.make_conditional(request)
         except Exception as e:
-            return f"<p class='text-danger'>Could not render DOCX: {str(e)}</p>"
+            return f"<p class='text-danger'>Could not render DOCX: {escape(str(e))}</p>"
 
-    return send_from_directory(
-        current_app.config['UPLOAD_FOLDER'],
-        filename,
-        mimetype='application/pdf' if file_ext == 'pdf' else None,
-        as_attachment=False
-    )
+    return send_report(report, as_attachment=False)
+
+
+def render_docx_report(report, storage):
+    cache = get_html_cache(current_app.config)
+    path = report_local_path(report, storage, current_app.config['UPLOAD_FOLDER'])
+    if report.sha256:
+        # Stored blobs never change under their key: the hash is the version
+        digest, last_modified = report.sha256, report.upload_date
+    else:
+        stat = os.stat(path)
+        digest = cache.digest(path, stat)
+        last_modified = datetime.fromtimestamp(int(stat.st_mtime), timezone.utc)
+    # The HTML also depends on the renderer, so a new RENDER_VERSION must not answer 304
+    etag = f"{digest}-{RENDER_VERSION}"
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        html_content = cache.cached(digest)
+        if html_content is None:
+            tmp = storage.download_to_temp(report.storage_key) if path is None else None
+            try:
+                html_content, _ = cache.get(tmp or path, digest)
+            finally:
+                if tmp:
+                    os.remove(tmp)
+        response = make_response(render_template_string("""
+            <!DOCTYPE html>
+            <html><body>{{ content }}</body></html>
+        """, content=Markup(html_content)))
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified.replace(microsecond=0)
+    return response
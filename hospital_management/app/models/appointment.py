@@ -10,3 +10,10 @@ class Appointment(db.Model):
 
     doctor = db.relationship('User', foreign_keys=[doctor_id], backref='doctor_appointments', lazy=True)
     patient = db.relationship('User', foreign_keys=[patient_id], backref='patient_appointments', lazy=True)
+
+    # Matches view_appointments: filter by doctor/patient, then order by date
+    __table_args__ = (
+        db.Index('ix_appointment_doctor_date', 'doctor_id', 'date'),
+        db.Index('ix_appointment_patient_date', 'patient_id', 'date'),
+        db.Index('ix_appointment_date', 'date'),
+    )
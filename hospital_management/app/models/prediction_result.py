@@ -1,17 +1,30 @@
 # models/prediction_result.py :
 from datetime import datetime
-from flask_sqlalchemy import SQLAlchemy
-from flask_login import UserMixin
 from app import db
 
 class PredictionResult(db.Model):
     __tablename__ = 'prediction_results'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # link with logged-in user
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)  # link with logged-in user
     symptoms = db.Column(db.Text, nullable=False)
     disease = db.Column(db.String(100), nullable=True)
     tests = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Each index ends in (created_at, id) to serve keyset pagination newest-first
+    __table_args__ = (
+        db.Index('ix_prediction_results_created_id', 'created_at', 'id'),
+        db.Index('ix_prediction_results_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_prediction_results_disease_created', 'disease', 'created_at', 'id'),
+    )
 
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "symptoms": self.symptoms.split(",") if self.symptoms else [],
+            "disease": self.disease,
+            "tests": self.tests.split(",") if self.tests else [],
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
@@ -10,9 +10,51 @@
 
 from app import db
 from datetime import datetime
+from sqlalchemy.orm import deferred
 
 class MedicalReport(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    filename = db.Column(db.String(255), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)  # original name, for display and downloads
     upload_date = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Content-addressed blob (storage.py); identical uploads share one storage_key
+    storage_key = db.Column(db.String(80))  # NULL: legacy file flat in UPLOAD_FOLDER
+    sha256 = db.Column(db.String(64))
+    size = db.Column(db.Integer)
+    content_type = db.Column(db.String(100))
+
+    # Filled once by the background ingestion pipeline (report_ingest.py)
+    content_text = deferred(db.Column(db.Text))  # only loaded when asked for, never by listings
+    extraction_status = db.Column(db.String(20), default='pending')  # pending | done | failed | unsupported
+    detected_symptoms = db.Column(db.Text)  # comma-separated canonical symptoms
+    extracted_at = db.Column(db.DateTime)
+
+    # Matches view_reports (per user or all, newest first), filename lookups and blob refcounts
+    __table_args__ = (
+        db.Index('ix_medical_report_user_upload', 'user_id', 'upload_date'),
+        db.Index('ix_medical_report_upload_date', 'upload_date'),
+        db.Index('ix_medical_report_filename', 'filename'),
+        db.Index('ix_medical_report_storage_key', 'storage_key'),
+    )
+
+    @property
+    def extension(self):
+        return self.filename.rsplit('.', 1)[-1].lower() if '.' in self.filename else ''
+
+    @property
+    def symptom_list(self):
+        return [s for s in (self.detected_symptoms or "").split(",") if s]
+
+
+class StoredBlob(db.Model):
+    """How many reports point at one content-addressed blob.
+
+    Uploads and deletes change the count in the same transaction as the
+    report row. The row (write) lock is what serializes "is this blob
+    still needed?" against a concurrent upload of the same content.
+    """
+    __tablename__ = 'stored_blob'
+
+    storage_key = db.Column(db.String(80), primary_key=True)
+    refcount = db.Column(db.Integer, nullable=False, default=0)
@@ -6,7 +6,7 @@ class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(100), unique=True, nullable=False)
     password = db.Column(db.String(100), nullable=False)
-    role = db.Column(db.String(20), nullable=False)  # 'admin', 'doctor', 'patient'
+    role = db.Column(db.String(20), nullable=False, index=True)  # 'admin', 'doctor', 'patient'
 
     def get_id(self):
         return str(self.id)
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from sqlalchemy.orm import joinedload, load_only
+
+from app.models.appointment import Appointment
+from app.models.user import User
+from app.services.pagination import keyset_page
+
+STATUSES = ("all", "upcoming", "past")
+
+
+# --------------------------------------------
+# 📅 Appointment listing: one query per page, newest (or soonest) first
+# --------------------------------------------
+def appointment_query(user=None, status="all", since=None, until=None, now=None):
+    """Appointments visible to ``user`` with doctor/patient names joined in the same SELECT.
+
+    Upcoming appointments are listed soonest first; everything else newest first.
+    """
+    query = Appointment.query.options(
+        load_only(Appointment.id, Appointment.doctor_id, Appointment.patient_id, Appointment.date, Appointment.reason),
+        joinedload(Appointment.doctor).load_only(User.id, User.username),
+        joinedload(Appointment.patient).load_only(User.id, User.username),
+    )
+
+    if user is not None and user.role == 'doctor':
+        query = query.filter(Appointment.doctor_id == user.id)
+    elif user is not None and user.role == 'patient':
+        query = query.filter(Appointment.patient_id == user.id)
+    elif user is not None and user.role != 'admin':
+        return None
+
+    now = now or datetime.now()
+    if status == "upcoming":
+        query = query.filter(Appointment.date >= now)
+    elif status == "past":
+        query = query.filter(Appointment.date < now)
+    if since is not None:
+        query = query.filter(Appointment.date >= since)
+    if until is not None:
+        query = query.filter(Appointment.date < until)
+
+    if status == "upcoming":
+        return query.order_by(Appointment.date.asc(), Appointment.id.asc())
+    return query.order_by(Appointment.date.desc(), Appointment.id.desc())
+
+
+def appointment_page(query, cursor=None, limit=20, ascending=False):
+    """Return (appointments, next_cursor) for the page after ``cursor``."""
+    return keyset_page(query, Appointment.date, Appointment.id, cursor, limit, ascending)
@@ -0,0 +1,140 @@
+import struct
+
+import numpy as np
+from cffi import FFI
+
+# Used only to hand PCM slices to Vosk's C API without copying them into bytes
+_ffi = FFI()
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class AudioFormatError(ValueError):
+    """Raised when an upload is not a WAV file we can decode."""
+
+
+class WavAudio:
+    def __init__(self, format_tag, channels, sample_rate, sample_width, frames):
+        self.format_tag = format_tag
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.frames = frames  # memoryview over the raw sample data, no copy
+
+    @property
+    def is_pcm16_mono(self):
+        return self.format_tag == WAVE_FORMAT_PCM and self.channels == 1 and self.sample_width == 2
+
+
+# --------------------------------
+# 🎧 Parse RIFF/WAVE straight from an in-memory buffer
+# --------------------------------
+def parse_wav(buffer):
+    view = memoryview(buffer)
+    if len(view) < 12 or view[0:4] != b"RIFF" or view[8:12] != b"WAVE":
+        raise AudioFormatError("Audio must be a WAV file")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = view[offset:offset + 4].tobytes()
+        (chunk_size,) = struct.unpack_from("<I", view, offset + 4)
+        body = offset + 8
+
+        if chunk_id == b"fmt ":
+            if chunk_size < 16 or body + 16 > len(view):
+                raise AudioFormatError("Malformed WAV format chunk")
+            format_tag, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", view, body)
+            if not (channels and sample_rate and bits):
+                raise AudioFormatError("Malformed WAV format chunk")
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40 and body + 26 <= len(view):
+                # The real format tag is the first two bytes of the SubFormat GUID
+                (format_tag,) = struct.unpack_from("<H", view, body + 24)
+            fmt = (format_tag, channels, sample_rate, bits)
+
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise AudioFormatError("WAV data chunk appears before format chunk")
+            format_tag, channels, sample_rate, bits = fmt
+            if format_tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT) or channels < 1 or bits % 8:
+                raise AudioFormatError("Unsupported WAV encoding")
+
+            # Streamed recorders often leave the size at 0 / 0xFFFFFFFF; read to the end then
+            end = len(view) if chunk_size in (0, 0xFFFFFFFF) else min(body + chunk_size, len(view))
+            sample_width = bits // 8
+            frame_size = sample_width * channels
+            end -= (end - body) % frame_size
+            return WavAudio(format_tag, channels, sample_rate, sample_width, view[body:end])
+
+        offset = body + chunk_size + (chunk_size & 1)
+
+    raise AudioFormatError("WAV file has no audio data")
+
+
+# --------------------------------
+# 🔁 Convert any PCM/float WAV to 16-bit mono at the recognizer rate
+# --------------------------------
+def to_pcm16_mono(audio, target_rate=None):
+    """Return (sample_rate, memoryview) of 16-bit mono PCM.
+
+    Input that is already 16-bit mono at the target rate is returned as a
+    view over the original buffer; anything else is converted once.
+    """
+    rate = target_rate or audio.sample_rate
+    if audio.is_pcm16_mono and audio.sample_rate == rate:
+        return rate, audio.frames
+
+    samples = _to_float(audio).reshape(-1, audio.channels)
+    mono = samples.mean(axis=1) if audio.channels > 1 else samples[:, 0]
+    if audio.sample_rate != rate:
+        mono = _resample(mono, audio.sample_rate, rate)
+
+    pcm = np.clip(mono * 32768.0, -32768, 32767).astype("<i2")
+    return rate, memoryview(pcm.tobytes())
+
+
+def _to_float(audio):
+    raw = audio.frames
+    width = audio.sample_width
+
+    if audio.format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        if width not in (4, 8):
+            raise AudioFormatError("Unsupported float WAV sample width")
+        return np.frombuffer(raw, dtype="<f4" if width == 4 else "<f8").astype(np.float32)
+
+    if width == 1:
+        # 8-bit WAV is unsigned
+        return (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    if width == 2:
+        return np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    if width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        return ints.astype(np.float32) / 8388608.0
+    if width == 4:
+        return np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+
+    raise AudioFormatError("Unsupported WAV sample width")
+
+
+def _resample(samples, src_rate, dst_rate):
+    if src_rate % dst_rate == 0:
+        # Integer decimation (e.g. 48k → 16k): average each block as a cheap low-pass
+        factor = src_rate // dst_rate
+        usable = len(samples) - len(samples) % factor
+        return samples[:usable].reshape(-1, factor).mean(axis=1)
+
+    n_out = int(round(len(samples) * dst_rate / src_rate))
+    src_times = np.arange(len(samples)) / src_rate
+    dst_times = np.arange(n_out) / dst_rate
+    return np.interp(dst_times, src_times, samples).astype(np.float32)
+
+
+def iter_chunks(pcm, frames_per_chunk=4000):
+    """Yield zero-copy slices of 16-bit PCM sized for KaldiRecognizer.AcceptWaveform."""
+    step = frames_per_chunk * 2
+    for start in range(0, len(pcm), step):
+        yield _ffi.from_buffer(pcm[start:start + step])
@@ -0,0 +1,145 @@
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+MAGIC = b"DFOREST1"
+ALIGNMENT = 64
+
+
+# --------------------------------------------
+# 🌲 Flatten a fitted RandomForestClassifier into plain node arrays
+# --------------------------------------------
+def compile_forest(clf, symptoms):
+    """Return (header, arrays) describing every tree of ``clf`` as flat NumPy arrays.
+
+    Leaves point both children at themselves, so evaluation can simply take
+    ``max_depth`` steps from each root without checking for leaves.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+
+    for estimator in clf.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        is_leaf = tree.children_left == -1
+        node_ids = np.arange(n)
+
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(np.where(is_leaf, 0.0, tree.threshold).astype(np.float32))
+        lefts.append((np.where(is_leaf, node_ids, tree.children_left) + offset).astype(np.int32))
+        rights.append((np.where(is_leaf, node_ids, tree.children_right) + offset).astype(np.int32))
+
+        value = tree.value[:, 0, :].astype(np.float64)
+        totals = value.sum(axis=1, keepdims=True)
+        values.append((value / np.where(totals == 0, 1, totals)).astype(np.float32))
+
+        roots.append(offset)
+        offset += n
+        max_depth = max(max_depth, tree.max_depth)
+
+    arrays = {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.concatenate(values),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+    header = {
+        "version": 1,
+        "symptoms": [str(s) for s in symptoms],
+        "classes": [str(c) for c in clf.classes_],
+        "n_trees": len(roots),
+        "max_depth": int(max_depth),
+    }
+    return header, arrays
+
+
+def save_compiled_forest(path, header, arrays):
+    """Write header + arrays to one file, each array 64-byte aligned so it can be memory-mapped."""
+    layout = {}
+    offset = 0
+    for name, arr in arrays.items():
+        layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += -(-arr.nbytes // ALIGNMENT) * ALIGNMENT
+
+    meta = json.dumps(dict(header, arrays=layout)).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 4 + len(meta)) // ALIGNMENT) * ALIGNMENT
+
+    # Written beside the target and renamed over it: running workers keep their
+    # mapping of the old inode instead of seeing the file truncated under them
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(meta)))
+            f.write(meta)
+            for name, arr in arrays.items():
+                f.seek(data_start + layout[name]["offset"])
+                f.write(np.ascontiguousarray(arr).tobytes())
+            f.truncate(data_start + offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def export_compiled_forest(clf, symptoms, path):
+    header, arrays = compile_forest(clf, symptoms)
+    save_compiled_forest(path, header, arrays)
+    return header
+
+
+# --------------------------------------------
+# ⚡ Evaluate the compiled forest over binary symptom vectors
+# --------------------------------------------
+class CompiledForest:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            # Read-only shared mapping: forked workers share the same physical pages
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a compiled disease forest")
+        (meta_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        meta_start = len(MAGIC) + 4
+        header = json.loads(self._mm[meta_start:meta_start + meta_len].decode("utf-8"))
+        data_start = -(-(meta_start + meta_len) // ALIGNMENT) * ALIGNMENT
+
+        self.symptoms = header["symptoms"]
+        self.classes_ = np.asarray(header["classes"], dtype=object)
+        self.n_trees = header["n_trees"]
+        self.max_depth = header["max_depth"]
+
+        for name, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"]))
+            arr = np.frombuffer(self._mm, dtype=dtype, count=count, offset=data_start + spec["offset"])
+            setattr(self, name, arr.reshape(spec["shape"]))
+
+        self.is_leaf = self.left == np.arange(len(self.left), dtype=np.int32)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        n = X.shape[0]
+        rows = np.arange(n)[:, None]
+        node = np.broadcast_to(self.roots, (n, self.n_trees)).copy()
+        for depth in range(self.max_depth):
+            # Most paths are far shorter than the deepest tree; stop once every row sits on a leaf
+            if depth % 4 == 0 and self.is_leaf[node].all():
+                break
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
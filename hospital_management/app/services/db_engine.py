@@ -0,0 +1,73 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+# --------------------------------------------
+# 🗄 Database engine setup: pool options + SQLite pragmas
+# --------------------------------------------
+def normalize_database_url(url):
+    # Heroku-style URLs use the scheme SQLAlchemy dropped in 1.4
+    if url.startswith("postgres://"):
+        return "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def is_sqlite(url):
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database."""
+    url = config["SQLALCHEMY_DATABASE_URI"]
+    options = {
+        "pool_pre_ping": True,
+        "pool_size": config.get("DB_POOL_SIZE", 5),
+        "max_overflow": config.get("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": config.get("DB_POOL_TIMEOUT", 30),
+    }
+    if is_sqlite(url):
+        # busy_timeout is also set as a pragma; the driver timeout covers the connect itself
+        options["connect_args"] = {
+            "timeout": config.get("SQLITE_BUSY_TIMEOUT_MS", 5000) / 1000.0,
+            "check_same_thread": False,
+        }
+        if make_url(url).database in (None, "", ":memory:"):
+            # In-memory databases live in a single connection; pool sizing does not apply
+            for key in ("pool_size", "max_overflow", "pool_timeout"):
+                options.pop(key)
+    else:
+        options["pool_recycle"] = config.get("DB_POOL_RECYCLE", 1800)
+    return options
+
+
+def sqlite_pragmas(config):
+    return [
+        ("journal_mode", "WAL" if config.get("SQLITE_WAL", True) else "DELETE"),
+        ("synchronous", config.get("SQLITE_SYNCHRONOUS", "NORMAL")),
+        ("busy_timeout", int(config.get("SQLITE_BUSY_TIMEOUT_MS", 5000))),
+        ("mmap_size", int(config.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))),
+        ("cache_size", -int(config.get("SQLITE_CACHE_SIZE_KB", 64 * 1024))),  # negative = KiB
+        ("temp_store", "MEMORY"),
+    ]
+
+
+def apply_sqlite_pragmas(engine, config):
+    """Run the tuning pragmas on every new connection to a SQLite engine."""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def init_engine(app, db):
+    """Apply pragmas to the app's engine; call after db.init_app(app)."""
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config)
+        if db.engine.dialect.name == "sqlite":
+            print(f"[INFO] SQLite tuned: {', '.join(f'{k}={v}' for k, v in sqlite_pragmas(app.config))}")
@@ -0,0 +1,103 @@
+import os
+import threading
+
+import numpy as np
+
+from app.services.compiled_forest import CompiledForest
+from app.services.micro_batcher import MicroBatcher
+
+
+# --------------------------------------------
+# 🧠 Vectorized wrapper around the disease forest (sklearn or compiled)
+# --------------------------------------------
+class DiseasePredictor:
+    def __init__(self, model, symptoms):
+        self.model = model
+        self.symptoms = list(symptoms)
+        # Precomputed symptom → feature column, replaces list scans on every call
+        self.symptom_index = {s: i for i, s in enumerate(self.symptoms)}
+        self.classes = [str(c) for c in model.classes_]
+
+    def split_known(self, symptoms):
+        """Return (known, unknown) symptom lists, preserving order and dropping duplicates."""
+        known, unknown = [], []
+        for s in dict.fromkeys(symptoms):
+            (known if s in self.symptom_index else unknown).append(s)
+        return known, unknown
+
+    def encode(self, symptom_sets):
+        """Encode N symptom lists into one (N, n_symptoms) float32 indicator matrix."""
+        X = np.zeros((len(symptom_sets), len(self.symptoms)), dtype=np.float32)
+        rows, cols = [], []
+        index = self.symptom_index
+        for row, symptoms in enumerate(symptom_sets):
+            for s in symptoms:
+                col = index.get(s)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        X[rows, cols] = 1.0
+        return X
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(X)
+
+    def predict_top_k(self, symptom_sets, k=3):
+        """Return, per symptom set, the k most likely (disease, probability) pairs.
+
+        All rows go through a single predict_proba call.
+        """
+        if not symptom_sets:
+            return []
+        proba = self.predict_proba(self.encode(symptom_sets))
+        k = max(1, min(k, proba.shape[1]))
+        top = np.argsort(-proba, axis=1, kind="stable")[:, :k]
+        return [
+            [(self.classes[c], float(proba[row, c])) for c in top[row]]
+            for row in range(len(symptom_sets))
+        ]
+
+    def predict(self, symptoms):
+        return self.predict_top_k([symptoms], k=1)[0][0][0]
+
+
+def load_predictor(model_path, encoder_path, compiled_path=None):
+    # ✅ Prefer the compiled forest: no scikit-learn import, no unpickling, mmap'd arrays
+    if compiled_path and os.path.exists(compiled_path):
+        stale = os.path.exists(model_path) and os.path.getmtime(model_path) > os.path.getmtime(compiled_path)
+        if stale:
+            print(f"[WARN] {compiled_path} is older than {model_path}; re-run train_model.py to recompile it.")
+        else:
+            forest = CompiledForest(compiled_path)
+            print(f"[INFO] Compiled disease forest loaded from: {compiled_path}")
+            return DiseasePredictor(forest, forest.symptoms)
+
+    if not (os.path.exists(model_path) and os.path.exists(encoder_path)):
+        print(f"[ERROR] Disease model or encoder not found at: {model_path}, {encoder_path}")
+        return None
+
+    import joblib
+    model = joblib.load(model_path)
+    encoder = joblib.load(encoder_path)
+    return DiseasePredictor(model, encoder.classes_.tolist())
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_prediction_batcher(predictor, config):
+    """Return the process-wide micro-batcher for single-row predictions, or None when disabled."""
+    global _batcher
+    if config.get("PREDICT_MICROBATCH_WAIT_MS", 0) <= 0:
+        return None
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(
+                    lambda symptom_sets: predictor.predict_top_k(symptom_sets, k=1),
+                    max_batch=config.get("PREDICT_MICROBATCH_MAX", 64),
+                    max_wait_ms=config.get("PREDICT_MICROBATCH_WAIT_MS"),
+                    name="predict-batcher",
+                )
+    return _batcher
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+from markupsafe import escape
+
+RENDER_VERSION = "1"  # bump when render_docx_html output changes, so old entries stop matching
+
+
+# --------------------------------------------
+# 📝 DOCX → HTML (escaped: report text is user content)
+# --------------------------------------------
+def render_docx_html(path):
+    from docx import Document
+
+    doc = Document(path)
+    parts = [f"<p>{escape(para.text)}</p>" for para in doc.paragraphs if para.text.strip()]
+    for table in doc.tables:
+        rows = "".join(
+            "<tr>" + "".join(f"<td>{escape(cell.text)}</td>" for cell in row.cells) + "</tr>"
+            for row in table.rows
+        )
+        parts.append(f'<table class="table table-bordered">{rows}</table>')
+    return "".join(parts)
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+# --------------------------------------------
+# 🗄️ Content-addressed on-disk cache with LRU eviction
+# --------------------------------------------
+class RenderedHtmlCache:
+    """Rendered HTML stored as <dir>/<ab>/<sha256>.html, where the hash is of the DOCX bytes.
+
+    The file is only hashed again when its (size, mtime) changes. Entries
+    are written atomically, so concurrent workers never read a partial
+    file. A cache hit bumps the entry's mtime; when the directory grows
+    past ``max_bytes``, the entries with the oldest mtimes are removed.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._digests = {}  # path -> (size, mtime_ns, sha256)
+        self._size = None  # bytes on disk; scanned lazily
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def digest(self, path, stat=None):
+        stat = stat or os.stat(path)
+        version = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            known = self._digests.get(path)
+        if known and known[:2] == version:
+            return known[2]
+        digest = file_digest(path)
+        with self._lock:
+            if len(self._digests) > 10000:
+                self._digests.clear()
+            self._digests[path] = version + (digest,)
+        return digest
+
+    def entry_path(self, digest):
+        return os.path.join(self.directory, digest[:2], f"{digest}.v{RENDER_VERSION}.html")
+
+    def cached(self, digest):
+        """Return the cached HTML for a DOCX digest, or None."""
+        entry = self.entry_path(digest)
+        try:
+            with open(entry, encoding="utf-8") as f:
+                html = f.read()
+            os.utime(entry)  # LRU: last use is the mtime
+            self.hits += 1
+            return html
+        except FileNotFoundError:
+            return None
+
+    def get(self, path, digest=None):
+        """Return (html, digest) for a DOCX file, rendering it at most once per version."""
+        digest = digest or self.digest(path)
+        html = self.cached(digest)
+        if html is not None:
+            return html, digest
+
+        self.misses += 1
+        entry = self.entry_path(digest)
+        html = render_docx_html(path)
+        self._store(entry, html)
+        return html, digest
+
+    def _store(self, entry, html):
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(entry), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp, entry)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += os.path.getsize(entry)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".html"):
+                    full = os.path.join(root, name)
+                    try:
+                        stat = os.stat(full)
+                    except FileNotFoundError:
+                        continue  # evicted by another worker
+                    yield full, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        # Rescan so eviction decisions include entries written by other workers
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9  # leave headroom so every write does not rescan
+        for full, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(full)
+                total -= size
+            except FileNotFoundError:
+                pass
+        self._size = total
+
+    def snapshot(self):
+        return {
+            "directory": self.directory,
+            "max_bytes": self.max_bytes,
+            "size_bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_html_cache(config):
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RenderedHtmlCache(
+                    config.get("REPORT_HTML_CACHE_DIR"),
+                    max_bytes=config.get("REPORT_HTML_CACHE_MAX_BYTES", 256 * 1024 * 1024),
+                )
+    return _cache
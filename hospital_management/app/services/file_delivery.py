@@ -0,0 +1,69 @@
+import os
+from urllib.parse import quote
+
+from flask import request
+from werkzeug.utils import send_file as werkzeug_send_file
+
+DELIVERY_MODES = ("python", "x-accel", "x-sendfile")
+
+
+# --------------------------------------------
+# 🚚 File delivery: offload to the front proxy, or stream with Range support
+# --------------------------------------------
+def accel_uri(path, config):
+    """Internal nginx URI for a local file, or None when it is outside REPORT_ACCEL_ROOT."""
+    root = os.path.realpath(config.get("REPORT_ACCEL_ROOT") or config["UPLOAD_FOLDER"])
+    relative = os.path.relpath(os.path.realpath(path), root)
+    if relative == ".." or relative.startswith(".." + os.sep):
+        return None
+    prefix = config.get("REPORT_ACCEL_PREFIX", "/protected-reports/").rstrip("/")
+    return f"{prefix}/{quote(relative.replace(os.sep, '/'))}"
+
+
+def deliver_file(config, path=None, stream=None, mimetype=None, download_name=None,
+                 as_attachment=False, size=None, etag=None, last_modified=None):
+    """Send an already-authorized file.
+
+    In "x-accel" / "x-sendfile" mode (REPORT_DELIVERY) only headers are
+    returned, and nginx / Apache / lighttpd send the bytes, Range requests
+    included. In "python" mode, or for blobs with no local path, the worker
+    streams the file itself and honours Range, If-None-Match and
+    If-Modified-Since. ``etag`` defaults to one derived from path, mtime and
+    size.
+    """
+    mode = config.get("REPORT_DELIVERY", "python")
+    internal_uri = accel_uri(path, config) if mode == "x-accel" and path is not None else None
+    offload = path is not None and (mode == "x-sendfile" or internal_uri is not None)
+
+    response = werkzeug_send_file(
+        path if path is not None else stream,
+        request.environ,
+        mimetype=mimetype,
+        as_attachment=as_attachment,
+        download_name=download_name,
+        conditional=False,
+        etag=etag if etag else path is not None,
+        last_modified=last_modified,
+        use_x_sendfile=offload,
+    )
+    response.cache_control.private = True
+
+    if offload:
+        if internal_uri is not None:
+            del response.headers["X-Sendfile"]
+            response.headers["X-Accel-Redirect"] = internal_uri
+        # Cheap 304s still come from here; the proxy takes care of Range
+        response.make_conditional(request.environ)
+        if response.status_code == 304:
+            response.headers.pop("X-Sendfile", None)
+            response.headers.pop("X-Accel-Redirect", None)
+        return response
+
+    if response.content_length is None and size is not None:
+        response.content_length = size  # streams from an object store carry no stat()
+    try:
+        return response.make_conditional(request.environ, accept_ranges=True,
+                                         complete_length=response.content_length)
+    except Exception:
+        response.close()
+        raise
@@ -0,0 +1,242 @@
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """Raised when the chat-completions API cannot produce an answer."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def normalize_input(text):
+    return " ".join(text.lower().split())
+
+
+# --------------------------------
+# 🤖 OpenRouter chat-completions client
+# --------------------------------
+class OpenRouterClient:
+    """Keep-alive HTTP session with timeouts, jittered retries, a concurrency cap and a TTL cache.
+
+    Identical requests already in flight are coalesced: followers wait for
+    the leader's upstream call instead of issuing their own.
+    """
+
+    def __init__(self, api_key, base_url="https://openrouter.ai/api/v1", model="openai/gpt-3.5-turbo",
+                 connect_timeout=3.05, read_timeout=20.0, max_retries=2, backoff_base=0.5,
+                 max_concurrency=8, cache_ttl=3600, cache_size=512):
+        self.api_key = api_key
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "http://localhost",
+            "X-Title": "Hospital-AI-Assistant"
+        })
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0, "retries": 0, "errors": 0,
+            "cache_hits": 0, "cache_misses": 0, "coalesced": 0,
+        }
+
+    # ---- cache -------------------------------------------------
+    def _cache_lookup(self, key):
+        # Caller holds self._lock
+        entry = self._cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._cache.move_to_end(key)
+            return entry[1]
+        self._cache.pop(key, None)
+        return None
+
+    def _cache_put(self, key, value):
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _bump(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    # ---- requests ----------------------------------------------
+    def complete(self, prompt, cache_key=None):
+        """Return the assistant message for ``prompt``; answers are cached and de-duplicated under ``cache_key``."""
+        if cache_key is None:
+            return self._request_content(prompt)
+
+        with self._lock:
+            cached = self._cache_lookup(cache_key)
+            if cached is not None:
+                self._stats["cache_hits"] += 1
+                return cached
+            self._stats["cache_misses"] += 1
+
+            future = self._inflight.get(cache_key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[cache_key] = future
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            content = self._request_content(prompt)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            self._cache_put(cache_key, content)
+            future.set_result(content)
+            return content
+        finally:
+            with self._lock:
+                self._inflight.pop(cache_key, None)
+
+    def _request_content(self, prompt):
+        return self._post({
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}]
+        })["choices"][0]["message"]["content"]
+
+    def cached(self, cache_key):
+        """Return a cached answer without calling upstream, or None."""
+        with self._lock:
+            return self._cache_lookup(cache_key)
+
+    def stream(self, prompt, cache_key=None):
+        """Yield the assistant message in pieces as the API streams them (``stream: true``).
+
+        The full answer is cached under ``cache_key`` once the stream completes.
+        """
+        if not self._slots.acquire(timeout=self.timeout[1]):
+            raise LLMError("Too many concurrent LLM requests")
+        parts = []
+        try:
+            self._bump("requests")
+            try:
+                response = self.session.post(self.url, json={
+                    "model": self.model,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "stream": True
+                }, timeout=self.timeout, stream=True)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._bump("errors")
+                raise LLMError(f"OpenRouter unreachable: {e.__class__.__name__}")
+
+            with response:
+                if response.status_code != 200:
+                    self._bump("errors")
+                    raise LLMError(f"OpenRouter Error: {response.status_code}", response.status_code)
+
+                for line in response.iter_lines(decode_unicode=True):
+                    # Server-sent events: "data: {...}" lines; ":" lines are keep-alive comments
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+        finally:
+            self._slots.release()
+
+        if cache_key is not None and parts:
+            self._cache_put(cache_key, "".join(parts))
+
+    def _post(self, payload):
+        if not self._slots.acquire(timeout=self.timeout[1]):
+            raise LLMError("Too many concurrent LLM requests")
+        try:
+            for attempt in range(self.max_retries + 1):
+                self._bump("requests")
+                try:
+                    response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = LLMError(f"OpenRouter unreachable: {e.__class__.__name__}")
+                    retry_after = None
+                else:
+                    if response.status_code == 200:
+                        return response.json()
+                    error = LLMError(f"OpenRouter Error: {response.status_code}", response.status_code)
+                    if response.status_code not in RETRYABLE_STATUS:
+                        break
+                    retry_after = response.headers.get("Retry-After")
+
+                if attempt < self.max_retries:
+                    self._bump("retries")
+                    time.sleep(self._backoff(attempt, retry_after))
+
+            self._bump("errors")
+            raise error
+        finally:
+            self._slots.release()
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.timeout[1])
+        # Full jitter so retries from many workers don't arrive in lockstep
+        return random.uniform(0, self.backoff_base * (2 ** attempt))
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cache_entries"] = len(self._cache)
+            stats["in_flight"] = len(self._inflight)
+        return stats
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client(api_key, config):
+    """Return the process-wide OpenRouter client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = OpenRouterClient(
+                    api_key,
+                    base_url=config.get("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
+                    model=config.get("OPENROUTER_MODEL", "openai/gpt-3.5-turbo"),
+                    connect_timeout=config.get("LLM_CONNECT_TIMEOUT", 3.05),
+                    read_timeout=config.get("LLM_READ_TIMEOUT", 20.0),
+                    max_retries=config.get("LLM_MAX_RETRIES", 2),
+                    max_concurrency=config.get("LLM_MAX_CONCURRENCY", 8),
+                    cache_ttl=config.get("LLM_CACHE_TTL", 3600),
+                    cache_size=config.get("LLM_CACHE_SIZE", 512),
+                )
+    return _client
@@ -0,0 +1,100 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+# --------------------------------------------
+# ⏱ Collect concurrent single-row calls into one vectorized call
+# --------------------------------------------
+class MicroBatcher:
+    """Runs ``batch_fn`` over requests gathered for up to ``max_wait_ms`` or ``max_batch`` rows.
+
+    ``batch_fn`` receives a list of items and must return a list of results
+    in the same order. Each caller blocks only on its own Future.
+    """
+
+    def __init__(self, batch_fn, max_batch=64, max_wait_ms=2.0, name="micro-batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "batches": 0,
+            "items": 0,
+            "failed_batches": 0,
+            "max_batch_size": 0,
+            "total_queue_ms": 0.0,
+            "max_queue_ms": 0.0,
+        }
+
+    def submit(self, item):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def run(self, item, timeout=None):
+        return self.submit(item).result(timeout=timeout)
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._execute(batch)
+
+    def _execute(self, batch):
+        started = time.perf_counter()
+        items = [item for item, _, _ in batch]
+        try:
+            results = list(self.batch_fn(items))
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name}: batch_fn returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            self._record(batch, started, failed=True)
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+
+        self._record(batch, started)
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def _record(self, batch, started, failed=False):
+        delays = [(started - enqueued) * 1000 for _, _, enqueued in batch]
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["items"] += len(batch)
+            self._stats["failed_batches"] += int(failed)
+            self._stats["max_batch_size"] = max(self._stats["max_batch_size"], len(batch))
+            self._stats["total_queue_ms"] += sum(delays)
+            self._stats["max_queue_ms"] = max(self._stats["max_queue_ms"], max(delays))
+
+    def snapshot(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["avg_batch_size"] = round(stats["items"] / (stats["batches"] or 1), 2)
+        stats["avg_queue_ms"] = round(stats["total_queue_ms"] / (stats["items"] or 1), 3)
+        stats["total_queue_ms"] = round(stats["total_queue_ms"], 3)
+        stats["max_queue_ms"] = round(stats["max_queue_ms"], 3)
+        stats["pending"] = self._queue.qsize()
+        stats["max_wait_ms"] = self.max_wait * 1000
+        stats["max_batch"] = self.max_batch
+        return stats
@@ -0,0 +1,75 @@
+import base64
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, or_
+
+
+# --------------------------------------------
+# 📅 Date filters from query parameters (?from=...&to=...)
+# --------------------------------------------
+def parse_date(value):
+    """Parse an ISO date/datetime query parameter, returning None when absent or invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def parse_until(value):
+    """Exclusive upper bound for a ``to`` parameter.
+
+    A bare date means "up to and including that day", so it becomes the
+    following midnight; a full datetime is used as given.
+    """
+    try:
+        day = date.fromisoformat(value) if value else None
+    except ValueError:
+        return parse_date(value)
+    if day is None:
+        return None
+    return datetime.combine(day + timedelta(days=1), datetime.min.time())
+
+
+# --------------------------------------------
+# 🔖 Keyset (timestamp, id) cursors
+# --------------------------------------------
+def encode_cursor(timestamp, row_id):
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Return (timestamp, id) from a cursor, or None if it is malformed."""
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def keyset_page(query, time_column, id_column, cursor=None, limit=20, ascending=False):
+    """Return (rows, next_cursor) for the page after ``cursor``.
+
+    ``query`` must already be ordered by (time_column, id_column) in the
+    same direction as ``ascending``.
+    """
+    if cursor is not None:
+        timestamp, row_id = cursor
+        if ascending:
+            query = query.filter(or_(
+                time_column > timestamp,
+                and_(time_column == timestamp, id_column > row_id),
+            ))
+        else:
+            query = query.filter(or_(
+                time_column < timestamp,
+                and_(time_column == timestamp, id_column < row_id),
+            ))
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor(getattr(last, time_column.key), getattr(last, id_column.key))
+    return rows[:limit], next_cursor
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# --------------------------------------------
+# 🗃 LRU + TTL cache of predictions keyed by canonical symptom set
+# --------------------------------------------
+class PredictionCache:
+    """Per-process cache in front of the predictor engine.
+
+    The predictor is loaded once at import and never reloaded, so after
+    train_model.py rewrites the model files the app must be restarted;
+    that also empties this cache.
+    """
+
+    def __init__(self, max_entries=1024, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    @staticmethod
+    def key(namespace, symptoms):
+        return namespace, tuple(sorted(set(symptoms)))
+
+    def get(self, namespace, symptoms):
+        key = self.key(namespace, symptoms)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                del self._entries[key]
+                self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, namespace, symptoms, value):
+        key = self.key(namespace, symptoms)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get_or_compute(self, namespace, symptoms, compute):
+        value = self.get(namespace, symptoms)
+        if value is None:
+            value = compute()
+            self.put(namespace, symptoms, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache(config):
+    """Return the process-wide prediction cache shared by every predict-disease handler."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PredictionCache(
+                    max_entries=config.get("PREDICTION_CACHE_SIZE", 1024),
+                    ttl=config.get("PREDICTION_CACHE_TTL", 600),
+                )
+    return _cache
@@ -0,0 +1,108 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import zlib
+
+from sqlalchemy import func, literal
+
+from app import db
+from app.models.prediction_result import PredictionResult
+from app.services.pagination import keyset_page
+
+
+# --------------------------------------------
+# 💾 Append-only prediction history in the prediction_results table
+# --------------------------------------------
+def history_query(user_id=None, disease=None, symptom=None, since=None, until=None):
+    query = PredictionResult.query
+    if user_id is not None:
+        query = query.filter(PredictionResult.user_id == user_id)
+    if disease:
+        query = query.filter(PredictionResult.disease == disease)
+    if symptom:
+        # Symptoms are stored comma-joined; match a whole entry, not a substring
+        pattern = "%," + symptom.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + ",%"
+        query = query.filter((literal(",") + PredictionResult.symptoms + literal(",")).like(pattern, escape="\\"))
+    if since is not None:
+        query = query.filter(PredictionResult.created_at >= since)
+    if until is not None:
+        query = query.filter(PredictionResult.created_at < until)
+    return query.order_by(PredictionResult.created_at.desc(), PredictionResult.id.desc())
+
+
+def history_page(query, cursor=None, limit=100):
+    """Return (results, next_cursor) for the page after ``cursor`` (newest first)."""
+    return keyset_page(query, PredictionResult.created_at, PredictionResult.id, cursor, limit)
+
+
+def history_etag(params):
+    """Cheap validator for a history page.
+
+    History is append-only, so a page can only change when a new row is
+    written; MAX(id) comes straight from the primary key index.
+    """
+    latest_id = db.session.query(func.max(PredictionResult.id)).scalar() or 0
+    fingerprint = json.dumps([latest_id, sorted(params.items())], default=str)
+    return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+
+# --------------------------------------------
+# 📥 Streaming CSV export
+# --------------------------------------------
+CSV_HEADER = ["symptoms", "disease", "tests", "user_id", "created_at"]
+
+
+def stream_history_csv(query, chunk_rows=500, flush_bytes=64 * 1024):
+    """Yield the CSV export in ~64 KB pieces, fetching rows ``chunk_rows`` at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+
+    for result in query.yield_per(chunk_rows):
+        writer.writerow([
+            (result.symptoms or "").replace(",", ";"),
+            result.disease or "",
+            (result.tests or "").replace(",", ";"),
+            result.user_id if result.user_id is not None else "",
+            result.created_at.isoformat() if result.created_at else "",
+        ])
+        if buffer.tell() >= flush_bytes:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 → gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# --------------------------------------------
+# 📂 One-off import of the legacy prediction_history.json
+# --------------------------------------------
+def import_legacy_json_history(path):
+    if not os.path.exists(path):
+        return 0
+
+    with open(path, "r") as f:
+        records = json.load(f)
+
+    db.session.bulk_save_objects([
+        PredictionResult(
+            symptoms=",".join(record.get("symptoms", [])),
+            disease=record.get("disease"),
+            tests=",".join(record.get("tests", [])),
+        )
+        for record in records
+    ])
+    db.session.commit()
+    os.replace(path, path + ".imported")
+    return len(records)
@@ -0,0 +1,134 @@
+import atexit
+import os
+import queue
+import threading
+from datetime import datetime
+
+from app import db
+from app.models.prediction_result import PredictionResult
+
+_STOP = object()
+
+
+# --------------------------------------------
+# ✍️ Background writer: batches prediction_results inserts off the request path
+# --------------------------------------------
+class PredictionWriter:
+    """Queues history rows in memory and inserts them in one transaction per batch.
+
+    The queue is bounded; when it is full, a row is either dropped or
+    written synchronously, depending on PREDICTION_WRITER_ON_FULL.
+    Rows still queued at interpreter exit are flushed by an atexit hook.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats = {"queued": 0, "written": 0, "batches": 0, "failed": 0, "overflows": 0, "dropped": 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get("PREDICTION_WRITER_ENABLED", True)
+        self.max_queue = app.config.get("PREDICTION_WRITER_QUEUE", 10000)
+        self.batch_size = app.config.get("PREDICTION_WRITER_BATCH", 500)
+        self.flush_interval = app.config.get("PREDICTION_WRITER_INTERVAL", 0.5)
+        self.on_full = app.config.get("PREDICTION_WRITER_ON_FULL", "drop")
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        atexit.register(self.close)
+
+    def _bump(self, key, n=1):
+        with self._lock:
+            self._stats[key] += n
+
+    def _ensure_started(self):
+        # Started lazily, and again after a fork: threads do not survive into child workers
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                if self._pid is not None and self._pid != os.getpid():
+                    self._queue = queue.Queue(maxsize=self.max_queue)
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="prediction-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, symptoms, disease, tests, user_id=None):
+        """Queue one history row; returns False if it was dropped because the queue is full."""
+        row = {
+            "user_id": user_id,
+            "symptoms": ",".join(symptoms),
+            "disease": disease,
+            "tests": ",".join(tests or []),
+            "created_at": datetime.utcnow(),
+        }
+        if not self.enabled:
+            self._write([row])
+            return True
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._bump("overflows")
+            if self.on_full == "sync":
+                self._write([row])
+                return True
+            self._bump("dropped")
+            return False
+        self._bump("queued")
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch, stop = [], item is _STOP
+            if not stop:
+                batch.append(item)
+            # Drain whatever else is waiting, up to one batch
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval if len(batch) == 1 else 0)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                self._write(batch)
+            if stop:
+                return
+
+    def _write(self, rows):
+        with self.app.app_context():
+            try:
+                db.session.execute(PredictionResult.__table__.insert(), rows)
+                db.session.commit()
+                self._bump("written", len(rows))
+                self._bump("batches")
+            except Exception as e:
+                db.session.rollback()
+                self._bump("failed", len(rows))
+                print(f"[ERROR] Failed to write {len(rows)} prediction history rows:", str(e))
+
+    def close(self, timeout=10):
+        """Flush queued rows and stop the writer thread."""
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP, timeout=timeout)
+        self._thread.join(timeout)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["pending"] = self._queue.qsize() if self._queue is not None else 0
+        stats["max_queue"] = getattr(self, "max_queue", 0)
+        return stats
+
+
+prediction_writer = PredictionWriter()
@@ -0,0 +1,249 @@
+import threading
+
+from app.services.disease_predictor import get_prediction_batcher
+from app.services.prediction_cache import get_prediction_cache
+from app.services.symptom_extractor import symptom_lexicon
+
+# --------------------------------------------
+# 📚 Precomputed knowledge tables (built once at import)
+# --------------------------------------------
+# symptom → diseases it points to (the former rule-based disease_map)
+SYMPTOM_DISEASES = {
+    "fever": ["Influenza", "Dengue", "Malaria"],
+    "cough": ["Common Cold", "Bronchitis", "COVID-19"],
+    "headache": ["Migraine", "Tension Headache", "Influenza"],
+    "rash": ["Allergy", "Chickenpox", "Measles"],
+    "nausea": ["Food Poisoning", "Gastritis"],
+    "fatigue": ["Anemia", "Hypothyroidism"],
+    "chest pain": ["Heart Attack", "Angina"],
+    "diarrhea": ["Food Poisoning", "Cholera"],
+}
+
+# disease (lower-case) → recommended lab tests; merges the rule-based
+# lab_tests_map with the ML route's get_tests_for_disease table
+DISEASE_TESTS = {
+    "influenza": ["CBC", "Influenza Test", "Chest X-Ray"],
+    "migraine": ["CT Scan", "MRI", "Neurological Exam"],
+    "dengue": ["Dengue NS1 Antigen", "Platelet Count", "CBC"],
+    "heart attack": ["ECG", "Troponin Test", "Chest X-ray"],
+    "food poisoning": ["Stool Culture", "Electrolyte Test"],
+    "malaria": ["Peripheral Blood Smear", "Rapid Diagnostic Test"],
+    "common cold": ["Physical Exam", "CBC"],
+    "sciatica": ["X-ray", "MRI", "Nerve Conduction Study"],
+    "chikungunya": ["ELISA", "CBC", "Liver Function Test"],
+    "bronchitis": ["Chest X-Ray"],
+    "covid-19": ["RT-PCR", "Antigen Test"],
+    "allergy": ["Allergy Test"],
+    "chickenpox": ["Varicella-Zoster Virus Test"],
+    "measles": ["Measles Antibody Test"],
+    "gastritis": ["Endoscopy"],
+    "anemia": ["CBC", "Iron Studies"],
+    "hypothyroidism": ["TSH Test"],
+    "angina": ["ECG", "Stress Test"],
+    "cholera": ["Stool Test"],
+}
+DEFAULT_TESTS = ["Consult General Physician"]
+
+
+def tests_for_disease(disease):
+    if not disease:
+        return []
+    return DISEASE_TESTS.get(disease.lower(), DEFAULT_TESTS)
+
+
+# --------------------------------------------
+# 📏 Rule backend: inverted index with specificity-weighted scores
+# --------------------------------------------
+class RulesBackend:
+    """Scores each disease by the symptoms pointing at it.
+
+    A symptom shared by n diseases contributes 1/n to each, so specific
+    symptoms outweigh generic ones; ties go to the disease matched by more
+    symptoms, then alphabetically, so the result depends only on the set
+    of symptoms (which is also the prediction cache key), not their order.
+    """
+
+    name = "rules"
+
+    def __init__(self, symptom_diseases=SYMPTOM_DISEASES):
+        self.symptom_index = {
+            symptom: tuple((disease, 1.0 / len(diseases)) for disease in diseases)
+            for symptom, diseases in symptom_diseases.items()
+        }
+        self.symptoms = sorted(self.symptom_index)
+
+    def split_known(self, symptoms):
+        known, unknown = [], []
+        for s in dict.fromkeys(symptoms):
+            (known if s in self.symptom_index else unknown).append(s)
+        return known, unknown
+
+    def rank(self, symptoms, k=3):
+        scores, hits = {}, {}
+        # Summed in sorted order so float rounding cannot depend on input order either
+        for symptom in sorted(set(symptoms)):
+            for disease, weight in self.symptom_index.get(symptom, ()):
+                scores[disease] = scores.get(disease, 0.0) + weight
+                hits[disease] = hits.get(disease, 0) + 1
+        if not scores:
+            return []
+        total = sum(scores.values())
+        ranked = sorted(scores, key=lambda d: (-scores[d], -hits[d], d))[:k]
+        return [(disease, scores[disease] / total) for disease in ranked]
+
+    def predict_top_k(self, symptom_sets, k=3):
+        return [self.rank(symptoms, k) for symptoms in symptom_sets]
+
+
+# --------------------------------------------
+# 🌲 Forest backend: the trained classifier (compiled or sklearn)
+# --------------------------------------------
+class ForestBackend:
+    name = "forest"
+
+    def __init__(self, predictor, batcher=None):
+        self.predictor = predictor
+        self.batcher = batcher
+        self.symptoms = predictor.symptoms
+
+    def split_known(self, symptoms):
+        return self.predictor.split_known(symptoms)
+
+    def predict_top_k(self, symptom_sets, k=3):
+        return self.predictor.predict_top_k(symptom_sets, k)
+
+    def rank(self, symptoms, k=3):
+        if k == 1 and self.batcher is not None:
+            # ✅ Concurrent single-row requests share one vectorized predict_proba
+            return self.batcher.run(symptoms, timeout=5)
+        return self.predict_top_k([symptoms], k)[0]
+
+
+# --------------------------------------------
+# 🤝 Ensemble backend: weighted blend of the others
+# --------------------------------------------
+class EnsembleBackend:
+    name = "ensemble"
+
+    def __init__(self, backends, weights, depth=10):
+        self.backends = list(backends)
+        self.weights = list(weights)
+        self.depth = depth
+        self.symptoms = sorted({s for backend in self.backends for s in backend.symptoms})
+        self._known = set(self.symptoms)
+
+    def split_known(self, symptoms):
+        known, unknown = [], []
+        for s in dict.fromkeys(symptoms):
+            (known if s in self._known else unknown).append(s)
+        return known, unknown
+
+    def predict_top_k(self, symptom_sets, k=3):
+        blended = [{} for _ in symptom_sets]
+        for backend, weight in zip(self.backends, self.weights):
+            # A backend only votes on the sets it recognises at least one symptom of
+            rows, known_sets = [], []
+            for row, symptoms in enumerate(symptom_sets):
+                known, _ = backend.split_known(symptoms)
+                if known:
+                    rows.append(row)
+                    known_sets.append(known)
+            for row, top in zip(rows, backend.predict_top_k(known_sets, self.depth)):
+                scores = blended[row]
+                for disease, score in top:
+                    scores[disease] = scores.get(disease, 0.0) + weight * score
+        return [
+            sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+            for scores in blended
+        ]
+
+    def rank(self, symptoms, k=3):
+        return self.predict_top_k([symptoms], k)[0]
+
+
+# --------------------------------------------
+# ⚙️ One engine in front of whichever backend is configured
+# --------------------------------------------
+class PredictorEngine:
+    def __init__(self, backend, cache=None):
+        self.backend = backend
+        self.cache = cache
+
+    @property
+    def name(self):
+        return self.backend.name
+
+    @property
+    def symptoms(self):
+        return self.backend.symptoms
+
+    def split_known(self, symptoms):
+        return self.backend.split_known(symptoms)
+
+    def normalize(self, symptoms):
+        """Strip/lowercase raw symptom strings and map synonyms onto the lexicon (non-strings dropped)."""
+        return [
+            symptom_lexicon.normalize(s.strip().lower())
+            for s in symptoms if isinstance(s, str) and s.strip()
+        ]
+
+    def predict(self, symptoms):
+        """Return (disease, tests) for already-known symptoms, served from the cache when possible."""
+        def compute():
+            top = self.backend.rank(symptoms, k=1)
+            disease = top[0][0] if top else None
+            return disease, tests_for_disease(disease)
+
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(self.name, symptoms, compute)
+
+    def predict_top_k(self, symptom_sets, k=3):
+        return self.backend.predict_top_k(symptom_sets, k)
+
+
+BACKENDS = ("forest", "rules", "ensemble")
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def build_backend(name, predictor, config):
+    if name not in BACKENDS:
+        print(f"[ERROR] Unknown PREDICTOR_BACKEND '{name}', using 'forest'.")
+        name = "forest"
+    if name != "rules" and predictor is None:
+        print("[ERROR] Disease model not loaded; falling back to the rule-based predictor.")
+        name = "rules"
+
+    if name == "rules":
+        return RulesBackend()
+    forest = ForestBackend(predictor, get_prediction_batcher(predictor, config))
+    if name == "forest":
+        return forest
+    weight = config.get("PREDICTOR_ENSEMBLE_FOREST_WEIGHT", 0.7)
+    return EnsembleBackend([forest, RulesBackend()], [weight, 1.0 - weight])
+
+
+def model_vocabulary(predictor):
+    """Every symptom any backend predicts from: the encoder's classes plus the rule table.
+
+    Reserved in the symptom lexicon at startup, so a synonym never rewrites
+    a model feature ("breathlessness" stays itself) whichever backend runs.
+    """
+    symptoms = set(SYMPTOM_DISEASES)
+    if predictor is not None:
+        symptoms.update(predictor.symptoms)
+    return sorted(symptoms)
+
+
+def get_predictor_engine(predictor, config):
+    """Return the process-wide predictor engine for the PREDICTOR_BACKEND setting."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                backend = build_backend(config.get("PREDICTOR_BACKEND", "forest"), predictor, config)
+                _engine = PredictorEngine(backend, get_prediction_cache(config))
+                print(f"[INFO] Disease predictor engine using the '{backend.name}' backend.")
+    return _engine
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import text
+
+from app import db
+from app.models.user import User
+from app.services.appointment_listing import appointment_query
+from app.services.prediction_history import history_query
+from app.services.report_search import report_query
+
+
+# Full-text searches sort only their matches, which is expected
+ALLOW_SORT = True
+
+
+# --------------------------------------------
+# 🔎 The queries the app runs most, as the controllers build them
+# --------------------------------------------
+def hot_queries():
+    return [
+        ("doctors for create_appointment", User.query.filter_by(role='doctor')),
+        ("appointments of a doctor", appointment_query(SimpleNamespace(id=1, role='doctor'))),
+        ("appointments of a patient", appointment_query(SimpleNamespace(id=1, role='patient'))),
+        ("all appointments (admin)", appointment_query(SimpleNamespace(id=1, role='admin'))),
+        ("upcoming appointments of a doctor", appointment_query(SimpleNamespace(id=1, role='doctor'), status='upcoming')),
+        ("reports of a user", report_query(user_id=1)),
+        ("all reports (admin)", report_query()),
+        ("report search of a user", report_query(user_id=1, search='blood test'), ALLOW_SORT),
+        ("prediction history", history_query()),
+        ("prediction history of a user", history_query(user_id=1)),
+        ("prediction history of a disease", history_query(disease='Influenza')),
+    ]
+
+
+def explain(query):
+    """Return the EXPLAIN QUERY PLAN detail lines for a query (SQLite only)."""
+    sql = str(query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in db.session.execute(text("EXPLAIN QUERY PLAN " + sql))]
+
+
+def plan_problems(plan, allow_sort=False):
+    """Full table scans and sorts the index should have made unnecessary."""
+    problems = []
+    for detail in plan:
+        if detail.startswith("SCAN ") and "INDEX" not in detail:
+            problems.append(detail)
+        elif "TEMP B-TREE" in detail and not allow_sort:
+            problems.append(detail)
+    return problems
+
+
+def check_query_plans():
+    """Return [(name, plan, problems)] for every hot query."""
+    results = []
+    for name, query, *options in hot_queries():
+        plan = explain(query)
+        results.append((name, plan, plan_problems(plan, allow_sort=bool(options and options[0]))))
+    return results
+
+
+@click.command("check-query-plans")
+@with_appcontext
+def check_query_plans_command():
+    """Fail if a hot query scans a whole table or sorts without an index."""
+    if db.engine.dialect.name != "sqlite":
+        click.echo("[INFO] Query plan check only runs against SQLite.")
+        return
+
+    failed = 0
+    for name, plan, problems in check_query_plans():
+        status = "FAIL" if problems else "ok"
+        click.echo(f"[{status:4s}] {name}: {' | '.join(plan)}")
+        failed += bool(problems)
+
+    if failed:
+        raise click.ClickException(f"{failed} hot queries are not served by an index")
+    click.echo("[✔] Every hot query uses an index.")
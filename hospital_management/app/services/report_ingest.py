@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+
+from app import db
+from app.models.report import MedicalReport
+from app.services.report_search import index_report
+from app.services.storage import get_storage, report_local_path
+from app.services.symptom_extractor import symptom_lexicon
+from app.services.text_extraction import TEXT_EXTENSIONS, UnsupportedReport, extract_text, pdf_support_available
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+STATUS_UNSUPPORTED = "unsupported"
+
+
+# --------------------------------------------
+# 🏭 Report ingestion: extract text once, off the web workers
+# --------------------------------------------
+class ReportIngestor:
+    """Sends uploaded reports to a process pool for text extraction.
+
+    When a worker finishes, the text, detected symptoms and status are
+    stored on the MedicalReport row and the report is re-indexed for
+    search. Big PDFs parse in separate processes, so they never hold the
+    GIL of a web worker.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        if not pdf_support_available():
+            print("[WARN] pypdf is not installed: uploaded PDFs get no text and stay unsearchable (pip install pypdf).")
+
+    def _executor(self):
+        # Recreated after a fork; "spawn" avoids forking a process that already runs threads
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.app.config.get("REPORT_EXTRACT_WORKERS", 2),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._pid = os.getpid()
+            return self._pool
+
+    def submit(self, report):
+        """Queue text extraction for a committed report; returns the Future, or None if skipped."""
+        ext = report.extension
+        if ext not in TEXT_EXTENSIONS:
+            self._store(report.id, status=STATUS_UNSUPPORTED)
+            return None
+
+        storage = get_storage(self.app.config)
+        path = report_local_path(report, storage, self.app.config["UPLOAD_FOLDER"])
+        # Object-store blobs are copied down for the worker and removed afterwards
+        temp_path = storage.download_to_temp(report.storage_key) if path is None else None
+        future = self._executor().submit(
+            extract_text, temp_path or path, self.app.config.get("REPORT_TEXT_MAX_CHARS", 1_000_000), ext
+        )
+        future.add_done_callback(lambda f, report_id=report.id: self._finish(report_id, f, temp_path))
+        return future
+
+    def _finish(self, report_id, future, temp_path=None):
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+        try:
+            text = future.result()
+        except UnsupportedReport as e:
+            print(f"[INFO] Report {report_id} not extracted: {e}")
+            self._store(report_id, status=STATUS_UNSUPPORTED)
+        except Exception as e:
+            print(f"[ERROR] Text extraction failed for report {report_id}:", str(e))
+            self._store(report_id, status=STATUS_FAILED)
+        else:
+            self._store(report_id, status=STATUS_DONE, text=text)
+
+    def _store(self, report_id, status, text=None):
+        with self.app.app_context():
+            try:
+                report = db.session.get(MedicalReport, report_id)
+                if report is None:
+                    return  # deleted while it was being extracted
+                report.extraction_status = status
+                report.extracted_at = datetime.utcnow()
+                if text is not None:
+                    report.content_text = text
+                    report.detected_symptoms = ",".join(symptom_lexicon.extract(text))
+                    index_report(report, text)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"[ERROR] Could not store extracted text for report {report_id}:", str(e))
+
+    def shutdown(self):
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.shutdown(wait=True)
+
+
+report_ingestor = ReportIngestor()
+
+
+@click.command("extract-reports")
+@click.option("--all", "reextract", is_flag=True, help="Re-extract reports that were already processed.")
+@with_appcontext
+def extract_reports_command(reextract):
+    """Extract text for reports uploaded before the ingestion pipeline (or all with --all)."""
+    query = MedicalReport.query
+    if not reextract:
+        query = query.filter(db.or_(
+            MedicalReport.extraction_status.is_(None),
+            MedicalReport.extraction_status == STATUS_PENDING,
+        ))
+    futures = [f for f in (report_ingestor.submit(report) for report in query.all()) if f is not None]
+    click.echo(f"[INFO] Extracting text from {len(futures)} reports...")
+    report_ingestor.shutdown()
+    click.echo("[✔] Done.")
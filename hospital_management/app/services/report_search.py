@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import text
+
+from app import db
+from app.models.report import MedicalReport
+from app.services.pagination import keyset_page
+
+SEARCH_TABLE = "report_search"
+MIN_TRIGRAM_TERM = 3  # the trigram tokenizer cannot match anything shorter
+
+
+# --------------------------------------------
+# 🔎 FTS5 trigram index over report filename + extracted text (SQLite)
+# --------------------------------------------
+def create_search_index(connection):
+    """Create the FTS5 table and fill it from medical_report; safe to run repeatedly."""
+    if connection.dialect.name != "sqlite":
+        return False
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SEARCH_TABLE}
+    ).first()
+    if exists:
+        return True
+    # rowid mirrors medical_report.id; case-insensitive substring matching via trigrams
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(filename, content, tokenize='trigram')"
+    ))
+    connection.execute(text(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, filename, content) SELECT id, filename, '' FROM medical_report"
+    ))
+    return True
+
+
+_available = None
+
+
+def search_index_available():
+    global _available
+    if _available is None:
+        _available = db.engine.dialect.name == "sqlite" and bool(db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SEARCH_TABLE}
+        ).first())
+    return _available
+
+
+def index_report(report, content=""):
+    """Add or refresh a report in the search index (part of the caller's transaction)."""
+    if search_index_available():
+        db.session.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :id"), {"id": report.id})
+        db.session.execute(
+            text(f"INSERT INTO {SEARCH_TABLE} (rowid, filename, content) VALUES (:id, :filename, :content)"),
+            {"id": report.id, "filename": report.filename, "content": content or ""},
+        )
+    report_counts.clear()
+
+
+def unindex_report(report_id):
+    if search_index_available():
+        db.session.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :id"), {"id": report_id})
+    report_counts.clear()
+
+
+def fts_phrase(term):
+    # Quote as one FTS5 phrase so user input is never parsed as query syntax
+    return '"' + term.replace('"', '""') + '"'
+
+
+# --------------------------------------------
+# 📄 Report listing: filter, search, keyset pages
+# --------------------------------------------
+def report_query(user_id=None, search=None):
+    query = MedicalReport.query
+    use_index = bool(search) and search_index_available() and len(search) >= MIN_TRIGRAM_TERM
+    if user_id is not None:
+        if use_index:
+            # "+ 0" keeps SQLite from walking the user's whole (user_id, upload_date)
+            # index; the FTS matches drive the lookup and only they get sorted
+            query = query.filter(MedicalReport.user_id + 0 == user_id)
+        else:
+            query = query.filter(MedicalReport.user_id == user_id)
+    if use_index:
+        matches = text(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :phrase") \
+            .bindparams(phrase=fts_phrase(search))
+        query = query.filter(MedicalReport.id.in_(matches))
+    elif search:
+        # Non-SQLite databases and 1–2 character terms
+        query = query.filter(MedicalReport.filename.ilike(f"%{search}%"))
+    return query.order_by(MedicalReport.upload_date.desc(), MedicalReport.id.desc())
+
+
+def report_page(query, cursor=None, limit=5):
+    """Return (reports, next_cursor) for the page after ``cursor`` (newest first)."""
+    return keyset_page(query, MedicalReport.upload_date, MedicalReport.id, cursor, limit)
+
+
+# --------------------------------------------
+# 🧮 Cached totals: counting every page was a second full scan
+# --------------------------------------------
+class CountCache:
+    """Short-lived totals per (user, search); cleared whenever this process indexes a report."""
+
+    def __init__(self, ttl=60, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+        value = compute()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+report_counts = CountCache()
+
+
+def approximate_total(user_id=None, search=None):
+    query = report_query(user_id, search).order_by(None)
+    return report_counts.get_or_compute((user_id, search or ""), query.count)
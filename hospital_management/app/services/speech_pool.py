@@ -0,0 +1,155 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from vosk import KaldiRecognizer
+
+
+class PoolSaturated(Exception):
+    """Raised when every decode worker is busy and the request queue is full."""
+
+
+# --------------------------------
+# 🎙 Recognizers keyed by sample rate (one shared Vosk Model)
+# --------------------------------
+class RecognizerPool:
+    def __init__(self, model, max_idle_per_rate=4):
+        self.model = model
+        self.max_idle_per_rate = max_idle_per_rate
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, sample_rate):
+        with self._lock:
+            idle = self._idle.get(sample_rate)
+            if idle:
+                return idle.pop()
+        rec = KaldiRecognizer(self.model, sample_rate)
+        rec.SetWords(True)
+        return rec
+
+    def release(self, sample_rate, rec):
+        rec.Reset()
+        with self._lock:
+            idle = self._idle.setdefault(sample_rate, [])
+            if len(idle) < self.max_idle_per_rate:
+                idle.append(rec)
+
+
+# --------------------------------
+# 🧵 Bounded decode workers with a request queue
+# --------------------------------
+class SpeechWorkerPool:
+    def __init__(self, recognizers, max_workers=2, max_queue=8):
+        self.recognizers = recognizers
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vosk-decode")
+        # Running + waiting jobs; anything beyond this is rejected instead of queued
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "in_flight": 0,
+            "total_queue_ms": 0.0,
+            "total_decode_ms": 0.0,
+            "max_queue_ms": 0.0,
+            "max_decode_ms": 0.0,
+            "audio_seconds": 0.0,
+        }
+
+    def submit(self, sample_rate, chunks):
+        if not self._slots.acquire(blocking=False):
+            self._bump("rejected")
+            raise PoolSaturated("All speech workers are busy")
+
+        self._bump("submitted")
+        self._bump("in_flight")
+        enqueued_at = time.perf_counter()
+        future = self._executor.submit(self._decode, sample_rate, chunks, enqueued_at)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def transcribe(self, sample_rate, chunks, timeout=None):
+        future = self.submit(sample_rate, chunks)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            self._bump("timed_out")
+            raise
+
+    def _on_done(self, future):
+        self._slots.release()
+        self._bump("in_flight", -1)
+        self._bump("failed" if future.exception() else "completed")
+
+    def _decode(self, sample_rate, chunks, enqueued_at):
+        started_at = time.perf_counter()
+        rec = self.recognizers.acquire(sample_rate)
+        results = []
+        n_bytes = 0
+        try:
+            for data in chunks:
+                n_bytes += len(data)
+                if rec.AcceptWaveform(data):
+                    results.append(json.loads(rec.Result()).get("text", ""))
+            results.append(json.loads(rec.FinalResult()).get("text", ""))
+        finally:
+            self.recognizers.release(sample_rate, rec)
+
+        finished_at = time.perf_counter()
+        timing = {
+            "queue_ms": round((started_at - enqueued_at) * 1000, 2),
+            "decode_ms": round((finished_at - started_at) * 1000, 2),
+            "audio_seconds": round(n_bytes / (2 * sample_rate), 2),
+        }
+        self._record_timing(timing)
+
+        transcript = " ".join(r for r in results if r).strip().lower()
+        return transcript, timing
+
+    def _bump(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _record_timing(self, timing):
+        with self._stats_lock:
+            self._stats["total_queue_ms"] += timing["queue_ms"]
+            self._stats["total_decode_ms"] += timing["decode_ms"]
+            self._stats["max_queue_ms"] = max(self._stats["max_queue_ms"], timing["queue_ms"])
+            self._stats["max_decode_ms"] = max(self._stats["max_decode_ms"], timing["decode_ms"])
+            self._stats["audio_seconds"] += timing["audio_seconds"]
+
+    def snapshot(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        done = stats["completed"] or 1
+        stats["avg_queue_ms"] = round(stats["total_queue_ms"] / done, 2)
+        stats["avg_decode_ms"] = round(stats["total_decode_ms"] / done, 2)
+        stats["workers"] = self.max_workers
+        stats["queue_size"] = self.max_queue
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_speech_pool(model, config):
+    """Return the process-wide decode pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                recognizers = RecognizerPool(model, max_idle_per_rate=config.get("SPEECH_WORKERS", 2))
+                _pool = SpeechWorkerPool(
+                    recognizers,
+                    max_workers=config.get("SPEECH_WORKERS", 2),
+                    max_queue=config.get("SPEECH_QUEUE_SIZE", 8),
+                )
+    return _pool
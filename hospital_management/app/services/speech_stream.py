@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+import uuid
+
+from app.services.speech_pool import PoolSaturated
+
+
+class StreamClosed(Exception):
+    """Raised when audio arrives for a stream that was already finished or reaped."""
+
+
+# --------------------------------
+# 📡 One live dictation: a checked-out recognizer fed chunk by chunk
+# --------------------------------
+class SpeechStream:
+    def __init__(self, sample_rate, rec):
+        self.id = uuid.uuid4().hex
+        self.sample_rate = sample_rate
+        self.rec = rec
+        self.results = []
+        self.last_seen = time.monotonic()
+        self.lock = threading.Lock()
+        self.closed = False
+
+    @property
+    def transcript(self):
+        return " ".join(r for r in self.results if r).strip().lower()
+
+    def feed(self, data):
+        with self.lock:
+            if self.closed:
+                raise StreamClosed(self.id)
+            self.last_seen = time.monotonic()
+            if self.rec.AcceptWaveform(data):
+                self.results.append(json.loads(self.rec.Result()).get("text", ""))
+                partial = ""
+            else:
+                partial = json.loads(self.rec.PartialResult()).get("partial", "")
+            return self.transcript, partial.strip().lower()
+
+    def finish(self, recognizers):
+        """Decode the tail and hand the recognizer back; None if the stream was already closed."""
+        with self.lock:
+            if self.closed:
+                return None
+            self.results.append(json.loads(self.rec.FinalResult()).get("text", ""))
+            self._release(recognizers)
+            return self.transcript
+
+    def expire(self, recognizers, cutoff):
+        """Close the stream if nothing was fed since ``cutoff``; True if it was closed."""
+        with self.lock:
+            if self.closed or self.last_seen >= cutoff:
+                return False
+            self._release(recognizers)
+            return True
+
+    def _release(self, recognizers):
+        # Caller holds self.lock. Closed goes first: a feed() waiting on the
+        # lock must never reach a recognizer that is back in the pool.
+        self.closed = True
+        rec, self.rec = self.rec, None
+        recognizers.release(self.sample_rate, rec)
+
+
+class SpeechStreamRegistry:
+    def __init__(self, recognizers, max_streams=8, idle_timeout=30):
+        self.recognizers = recognizers
+        self.max_streams = max_streams
+        self.idle_timeout = idle_timeout
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def open(self, sample_rate):
+        self.reap_idle()
+        with self._lock:
+            if len(self._streams) >= self.max_streams:
+                raise PoolSaturated("Too many live dictation streams")
+            stream = SpeechStream(sample_rate, self.recognizers.acquire(sample_rate))
+            self._streams[stream.id] = stream
+        return stream
+
+    def get(self, stream_id):
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def close(self, stream_id):
+        with self._lock:
+            stream = self._streams.pop(stream_id, None)
+        if stream is None:
+            return None
+        return stream.finish(self.recognizers)
+
+    def reap_idle(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            stale = [s for s in self._streams.values() if s.last_seen < cutoff]
+        # Re-checked under each stream's lock: a chunk may have arrived meanwhile
+        for stream in stale:
+            if stream.expire(self.recognizers, cutoff):
+                with self._lock:
+                    self._streams.pop(stream.id, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._streams)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_stream_registry(recognizers, config):
+    """Return the process-wide live stream registry, creating it on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SpeechStreamRegistry(
+                    recognizers,
+                    max_streams=config.get("SPEECH_MAX_STREAMS", 8),
+                    idle_timeout=config.get("SPEECH_STREAM_IDLE_TIMEOUT", 30),
+                )
+    return _registry
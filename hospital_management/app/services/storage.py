@@ -0,0 +1,343 @@
+import hashlib
+import mimetypes
+import os
+import shutil
+import tempfile
+import threading
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app import db
+from app.models.report import MedicalReport, StoredBlob
+
+# --------------------------------------------
+# 🔐 Streaming SHA-256: the upload is hashed while it is written to disk
+# --------------------------------------------
+def hash_to_temp(stream, directory, chunk_size=1024 * 1024):
+    """Copy ``stream`` to a temp file in ``directory``; return (temp_path, sha256, size)."""
+    os.makedirs(directory, exist_ok=True)
+    sha = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: stream.read(chunk_size), b""):
+                sha.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except Exception:
+        os.remove(tmp)
+        raise
+    return tmp, sha.hexdigest(), size
+
+
+def content_key(digest):
+    # Two levels of 256 shards keep every directory small
+    return f"{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+# --------------------------------------------
+# 📦 Storage backends
+# --------------------------------------------
+class StorageBackend:
+    """Content-addressed blob store: identical uploads map to the same key.
+
+    Backends implement put_file/open/delete/exists; local_path returns a
+    path on this machine when there is one (used for send_file, X-Sendfile
+    and text extraction) and None otherwise.
+    """
+
+    name = "base"
+
+    def __init__(self, temp_dir, chunk_size=1024 * 1024):
+        self.temp_dir = temp_dir
+        self.chunk_size = chunk_size
+
+    def stage(self, stream):
+        """Stream an upload to a temp file, hashing as it goes; returns (temp_path, key, sha256, size)."""
+        tmp, digest, size = hash_to_temp(stream, self.temp_dir, self.chunk_size)
+        return tmp, content_key(digest), digest, size
+
+    def put_file(self, path, key):
+        """Store the file at ``path`` under ``key``; return False if the key already existed."""
+        raise NotImplementedError
+
+    def open(self, key):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def local_path(self, key):
+        return None
+
+    def download_to_temp(self, key):
+        """Copy a stored object to a local temp file (caller removes it)."""
+        os.makedirs(self.temp_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.temp_dir)
+        with os.fdopen(fd, "wb") as out, self.open(key) as src:
+            shutil.copyfileobj(src, out, self.chunk_size)
+        return tmp
+
+
+class LocalStorage(StorageBackend):
+    """Blobs under <root>/<ab>/<cd>/<sha256> on the local filesystem."""
+
+    name = "local"
+
+    def __init__(self, root, chunk_size=1024 * 1024):
+        # Temp files sit on the same filesystem so the final move is an atomic rename
+        super().__init__(os.path.join(root, "tmp"), chunk_size)
+        self.root = root
+
+    def local_path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def put_file(self, path, key):
+        target = self.local_path(key)
+        if os.path.exists(target):
+            return False  # duplicate upload: already stored
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        return True
+
+    def open(self, key):
+        return open(self.local_path(key), "rb")
+
+    def delete(self, key):
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, key):
+        return os.path.exists(self.local_path(key))
+
+
+class LocalObjectStoreClient:
+    """Directory-backed stand-in for an S3-style client (put/get/head/delete_object).
+
+    Swap in a real client with the same four calls (e.g. a boto3 S3 client)
+    to move reports to an object store without touching the controllers.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root, bucket, *key.split("/"))
+
+    def put_object(self, Bucket, Key, Body):
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(Body, out)
+        os.replace(tmp, path)
+        return {}
+
+    def get_object(self, Bucket, Key):
+        path = self._path(Bucket, Key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(Key)
+        return {"Body": open(path, "rb"), "ContentLength": os.path.getsize(path)}
+
+    def head_object(self, Bucket, Key):
+        path = self._path(Bucket, Key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(Key)
+        return {"ContentLength": os.path.getsize(path)}
+
+    def delete_object(self, Bucket, Key):
+        try:
+            os.remove(self._path(Bucket, Key))
+        except FileNotFoundError:
+            pass
+        return {}
+
+
+class ObjectStorage(StorageBackend):
+    """Blobs in an object-store bucket, through an S3-style client."""
+
+    name = "object"
+
+    def __init__(self, client, bucket, temp_dir, prefix="reports/", chunk_size=1024 * 1024):
+        super().__init__(temp_dir, chunk_size)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def put_file(self, path, key):
+        if self.exists(key):
+            return False
+        with open(path, "rb") as body:
+            self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=body)
+        return True
+
+    def open(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"]
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.prefix + key)
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+            return True
+        except Exception:
+            return False
+
+
+def build_storage(config):
+    chunk_size = config.get("STORAGE_CHUNK_SIZE", 1024 * 1024)
+    if config.get("STORAGE_BACKEND", "local") == "object":
+        client = LocalObjectStoreClient(config.get("OBJECT_STORE_DIR"))
+        return ObjectStorage(client, config.get("OBJECT_STORE_BUCKET", "reports"),
+                             temp_dir=os.path.join(config.get("STORAGE_ROOT"), "tmp"), chunk_size=chunk_size)
+    return LocalStorage(config.get("STORAGE_ROOT"), chunk_size=chunk_size)
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage(config):
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = build_storage(config)
+                print(f"[INFO] Report storage: {_storage.name}")
+    return _storage
+
+
+# --------------------------------------------
+# 🔢 Refcounted blobs: save and release are serialized per key by the DB
+# --------------------------------------------
+def acquire_blob(storage_key):
+    """Count one more reference to a blob (part of the caller's transaction).
+
+    The UPDATE takes the write lock (the row lock on server databases) before
+    the blob is checked, so a concurrent release of the same key either
+    finishes first or waits for the caller to commit.
+    """
+    table = StoredBlob.__table__
+    updated = db.session.execute(
+        table.update().where(table.c.storage_key == storage_key).values(refcount=table.c.refcount + 1)
+    ).rowcount
+    if not updated:
+        db.session.add(StoredBlob(storage_key=storage_key, refcount=1))
+        db.session.flush()
+
+
+def release_blob(storage_key):
+    """Drop one reference; True when none remain (part of the caller's transaction).
+
+    The bytes are left alone: once the caller has committed, purge_blob
+    removes them. A failed commit therefore never strands a report whose
+    file is already gone.
+    """
+    table = StoredBlob.__table__
+    db.session.execute(
+        table.update().where(table.c.storage_key == storage_key).values(refcount=table.c.refcount - 1)
+    )
+    remaining = db.session.execute(
+        db.select(table.c.refcount).where(table.c.storage_key == storage_key)
+    ).scalar()
+    return remaining is not None and remaining <= 0
+
+
+def purge_blob(storage_key, storage):
+    """Delete a blob nobody references, in its own transaction; False if it was re-used meanwhile.
+
+    The row is deleted first, which takes the same lock acquire_blob needs,
+    and the bytes go before that commits: a concurrent upload of the same
+    content either bumped the refcount already or waits and stores it again.
+    """
+    table = StoredBlob.__table__
+    try:
+        gone = db.session.execute(
+            table.delete().where(table.c.storage_key == storage_key, table.c.refcount <= 0)
+        ).rowcount
+        if gone:
+            storage.delete(storage_key)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return bool(gone)
+
+
+def store_report_file(report, stream, storage):
+    """Hash ``stream`` into the store and point ``report`` at it; the caller commits.
+
+    Hashing happens before any lock is taken; only the refcount bump and the
+    final move into place run inside the transaction.
+    """
+    tmp, key, digest, size = storage.stage(stream)
+    try:
+        acquire_blob(key)
+        if not storage.exists(key):
+            storage.put_file(tmp, key)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    report.storage_key, report.sha256, report.size = key, digest, size
+    return report
+
+
+# --------------------------------------------
+# 📄 Where a report's bytes live
+# --------------------------------------------
+def report_local_path(report, storage, upload_folder):
+    """Local path of a report's file, or None when it only exists in an object store.
+
+    Reports uploaded before content-addressed storage have no storage_key and
+    still sit flat in UPLOAD_FOLDER under their filename.
+    """
+    if report.storage_key:
+        return storage.local_path(report.storage_key)
+    return os.path.join(upload_folder, report.filename)
+
+
+def report_file_exists(report, storage, upload_folder):
+    if report.storage_key:
+        return storage.exists(report.storage_key)
+    return os.path.exists(os.path.join(upload_folder, report.filename))
+
+
+@click.command("purge-blobs")
+@with_appcontext
+def purge_blobs_command():
+    """Remove stored blobs left unreferenced (e.g. when a delete failed after its commit)."""
+    storage = get_storage(current_app.config)
+    table = StoredBlob.__table__
+    keys = db.session.execute(db.select(table.c.storage_key).where(table.c.refcount <= 0)).scalars().all()
+    purged = sum(purge_blob(key, storage) for key in keys)
+    click.echo(f"[✔] Purged {purged} unreferenced blobs from {storage.name} storage.")
+
+
+@click.command("store-legacy-uploads")
+@with_appcontext
+def store_legacy_uploads_command():
+    """Move reports uploaded before content-addressed storage into the store."""
+    storage = get_storage(current_app.config)
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+    moved = missing = 0
+    for report in MedicalReport.query.filter(MedicalReport.storage_key.is_(None)).all():
+        path = os.path.join(upload_folder, report.filename)
+        if not os.path.isfile(path):
+            missing += 1
+            continue
+        with open(path, "rb") as f:
+            store_report_file(report, f, storage)
+        report.content_type = report.content_type or mimetypes.guess_type(report.filename)[0]
+        db.session.commit()
+        os.remove(path)  # only after the row points at the stored copy
+        moved += 1
+    click.echo(f"[✔] Moved {moved} reports into {storage.name} storage ({missing} files missing).")
@@ -0,0 +1,231 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+KNOWN_SYMPTOMS_PATH = os.path.join(base_dir, "..", "..", "known_symptoms.json")
+
+DEFAULT_SYMPTOMS = [
+    "fever", "cough", "headache", "nausea", "vomiting", "fatigue", "chest pain",
+    "rash", "sore throat", "body pain", "diarrhea", "shortness of breath",
+    "dizziness", "cold", "sneezing", "throat pain", "chest pain", "pain", "migraine", "weakness",
+    "itching", "swelling", "runny nose", "loss of appetite", "weight loss",
+    "night sweats", "abdominal pain", "joint pain", "blurred vision", "irritation",
+    "muscle ache", "burning sensation", "tingling", "loss of taste", "loss of smell",
+    "palpitations", "frequent urination", "dry mouth", "difficulty breathing", "tired",
+    "yellowing of skin", "dehydration", "congestion", "chills", "bleeding", "insomnia"
+]
+
+# Everyday phrasings patients use → canonical lexicon entry
+DEFAULT_SYNONYMS = {
+    "high temperature": "fever",
+    "feverish": "fever",
+    "coughing": "cough",
+    "headaches": "headache",
+    "head ache": "headache",
+    "throwing up": "vomiting",
+    "feeling sick": "nausea",
+    "nauseous": "nausea",
+    "tiredness": "fatigue",
+    "exhaustion": "fatigue",
+    "breathlessness": "shortness of breath",
+    "short of breath": "shortness of breath",
+    "trouble breathing": "difficulty breathing",
+    "stomach ache": "abdominal pain",
+    "stomach pain": "abdominal pain",
+    "tummy ache": "abdominal pain",
+    "loose motions": "diarrhea",
+    "diarrhoea": "diarrhea",
+    "dizzy": "dizziness",
+    "itchy": "itching",
+    "stuffy nose": "congestion",
+    "blocked nose": "congestion",
+    "aching muscles": "muscle ache",
+    "muscle pain": "muscle ache",
+    "can't sleep": "insomnia",
+    "sweating at night": "night sweats",
+    "jaundice": "yellowing of skin",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+# --------------------------------
+# 🔤 Aho–Corasick automaton over word tokens
+# --------------------------------
+class SymptomAutomaton:
+    """Finds every lexicon phrase in a token stream in one left-to-right pass.
+
+    Matching works on whole words, so "pain" never matches inside "painful".
+    Overlapping hits are resolved leftmost-longest: "chest pain" wins over
+    the "pain" it contains.
+    """
+
+    def __init__(self, lexicon):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self.terms = {}
+
+        for phrase, canonical in lexicon.items():
+            tokens = tokenize(phrase)
+            if not tokens:
+                continue
+            key = " ".join(tokens)
+            self.terms[key] = canonical
+            state = 0
+            for token in tokens:
+                nxt = self._goto[state].get(token)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][token] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] = ((len(tokens), canonical),)
+
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Inherit the matches of the longest proper suffix
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, tokens):
+        """Return (start, end, canonical) for every phrase occurrence."""
+        matches = []
+        state = 0
+        for i, token in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, canonical in self._out[state]:
+                matches.append((i + 1 - length, i + 1, canonical))
+        return matches
+
+    def extract(self, text):
+        """Return the distinct canonical symptoms mentioned in text, in order."""
+        matches = sorted(self.find_all(tokenize(text)), key=lambda m: (m[0], m[0] - m[1]))
+        found = []
+        covered_until = 0
+        for start, end, canonical in matches:
+            if start < covered_until:
+                continue
+            covered_until = end
+            if canonical not in found:
+                found.append(canonical)
+        return found
+
+    def canonical(self, phrase):
+        """Return the canonical name if phrase is exactly a lexicon entry, else None."""
+        return self.terms.get(" ".join(tokenize(phrase)))
+
+
+# --------------------------------
+# 🩺 Create/load known_symptoms.json
+# --------------------------------
+def load_or_create_symptom_json(file_path):
+    if not os.path.exists(file_path):
+        with open(file_path, "w") as f:
+            json.dump(DEFAULT_SYMPTOMS, f, indent=4)
+        print(f"[INFO] Created new known_symptoms.json with {len(DEFAULT_SYMPTOMS)} symptoms.")
+
+    with open(file_path, "r") as f:
+        symptoms = json.load(f)
+
+    return symptoms
+
+
+def build_lexicon(symptoms, synonyms=None, reserved=()):
+    """Map every surface form to its canonical symptom.
+
+    ``symptoms`` is either a list of names or a dict of
+    ``{canonical: [synonym, ...]}`` as stored in known_symptoms.json.
+    ``reserved`` terms (the predictor's own features) always map to
+    themselves, so a synonym never rewrites something the model knows.
+    """
+    lexicon = {}
+    if isinstance(symptoms, dict):
+        for canonical, aliases in symptoms.items():
+            canonical = canonical.strip().lower()
+            lexicon[canonical] = canonical
+            for alias in aliases or []:
+                lexicon[alias.strip().lower()] = canonical
+    else:
+        for symptom in symptoms:
+            symptom = symptom.strip().lower()
+            lexicon[symptom] = symptom
+
+    for term in reserved:
+        term = term.strip().lower()
+        lexicon[term] = term
+    for alias, canonical in (synonyms or {}).items():
+        lexicon.setdefault(alias, canonical)
+    return lexicon
+
+
+# --------------------------------
+# ♻️ Compiled lexicon, rebuilt when the JSON file changes
+# --------------------------------
+class SymptomLexicon:
+    def __init__(self, path, synonyms=None, check_interval=2.0):
+        self.path = path
+        self.synonyms = DEFAULT_SYNONYMS if synonyms is None else synonyms
+        self.check_interval = check_interval
+        self.reserved = frozenset()
+        self._automaton = None
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, terms):
+        """Keep ``terms`` (e.g. the encoder's symptom classes) mapped to themselves."""
+        with self._lock:
+            reserved = self.reserved | {t.strip().lower() for t in terms}
+            if reserved != self.reserved:
+                self.reserved = frozenset(reserved)
+                self._automaton = None
+
+    def automaton(self):
+        now = time.monotonic()
+        if self._automaton is not None and now - self._checked_at < self.check_interval:
+            return self._automaton
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if self._automaton is None or mtime != self._mtime:
+                symptoms = load_or_create_symptom_json(self.path)
+                self._automaton = SymptomAutomaton(build_lexicon(symptoms, self.synonyms, self.reserved))
+                self._mtime = os.stat(self.path).st_mtime_ns
+            return self._automaton
+
+    def extract(self, text):
+        return self.automaton().extract(text or "")
+
+    def normalize(self, symptom):
+        """Map a single symptom (or synonym) to its canonical name; unknown input is returned as-is."""
+        return self.automaton().canonical(symptom) or symptom
+
+
+symptom_lexicon = SymptomLexicon(KNOWN_SYMPTOMS_PATH)
@@ -0,0 +1,152 @@
+import threading
+import time
+
+import numpy as np
+from flask import current_app
+
+from app.services.symptom_extractor import DEFAULT_SYNONYMS, SymptomAutomaton, build_lexicon
+
+
+# --------------------------------------------
+# 🧮 Symptom × symptom co-occurrence suggester (offline, no network)
+# --------------------------------------------
+class CooccurrenceSuggester:
+    """Answers "what else might they have" from symptom sets seen together.
+
+    ``cooccurrence[a, b]`` counts the sets containing both a and b, so row
+    ``a`` divided by its diagonal is P(b | a). Suggestions for several input
+    symptoms sum those conditional probabilities.
+    """
+
+    def __init__(self, symptom_sets):
+        sets = [
+            list(dict.fromkeys(s.strip().lower() for s in symptoms if s and s.strip()))
+            for symptoms in symptom_sets
+        ]
+        sets = [s for s in sets if s]
+        self.symptoms = sorted({s for symptoms in sets for s in symptoms})
+        self.symptom_index = {s: i for i, s in enumerate(self.symptoms)}
+        self.n_sets = len(sets)
+
+        incidence = np.zeros((len(sets), len(self.symptoms)), dtype=np.float32)
+        rows = [row for row, symptoms in enumerate(sets) for _ in symptoms]
+        cols = [self.symptom_index[s] for symptoms in sets for s in symptoms]
+        incidence[rows, cols] = 1.0
+
+        self.cooccurrence = incidence.T @ incidence
+        self.frequency = np.diag(self.cooccurrence).copy()
+        self.conditional = self.cooccurrence / np.maximum(self.frequency, 1.0)[:, None]
+        self.automaton = SymptomAutomaton(build_lexicon(self.symptoms, DEFAULT_SYNONYMS))
+
+    def known(self, symptoms):
+        return [self.symptom_index[s] for s in symptoms if s in self.symptom_index]
+
+    def suggest(self, symptoms, k=5):
+        """Return up to k related symptoms for a list of symptoms, strongest association first."""
+        idx = self.known(dict.fromkeys(s.strip().lower() for s in symptoms))
+        if not idx:
+            return []
+        scores = self.conditional[idx].sum(axis=0)
+        # Break ties toward symptoms seen more often overall
+        scores = scores + self.frequency / (self.frequency.max() * 1000.0)
+        scores[idx] = 0.0
+        scores[self.cooccurrence[idx].sum(axis=0) == 0] = 0.0
+
+        k = min(k, int((scores > 0).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [self.symptoms[i] for i in top]
+
+    def suggest_for_text(self, text, k=5):
+        return self.suggest(self.automaton.extract(text or ""), k)
+
+    def snapshot(self):
+        return {"symptoms": len(self.symptoms), "symptom_sets": self.n_sets}
+
+
+def training_symptom_sets():
+    """Symptom lists from the curated training samples in train_model.py."""
+    from train_model import samples
+    return [symptoms for symptoms, _ in samples]
+
+
+def history_symptom_sets(limit=50000):
+    """Symptom lists from the most recent stored predictions."""
+    from app import db
+    from app.models.prediction_result import PredictionResult
+
+    try:
+        rows = (
+            db.session.query(PredictionResult.symptoms)
+            .order_by(PredictionResult.id.desc())
+            .limit(limit)
+            .all()
+        )
+    except Exception as e:
+        db.session.rollback()
+        print(f"[ERROR] Could not read prediction history for suggestions: {e}")
+        return []
+    return [symptoms.split(",") for (symptoms,) in rows if symptoms]
+
+
+_suggester = None
+_built_at = 0.0
+_refreshing = False
+_suggester_lock = threading.Lock()  # guards the three globals above; held only briefly
+_build_lock = threading.Lock()  # first build only
+
+
+def build_symptom_suggester(config):
+    """Build a fresh suggester from the training samples and recent history (needs an app context)."""
+    sets = training_symptom_sets() + history_symptom_sets(config.get("SUGGESTER_HISTORY_LIMIT", 50000))
+    suggester = CooccurrenceSuggester(sets)
+    print(f"[INFO] Symptom suggester built from {suggester.n_sets} symptom sets.")
+    return suggester
+
+
+def _install(suggester):
+    global _suggester, _built_at
+    with _suggester_lock:
+        _suggester, _built_at = suggester, time.monotonic()
+
+
+def _refresh(app):
+    global _built_at, _refreshing
+    try:
+        with app.app_context():
+            _install(build_symptom_suggester(app.config))
+    except Exception as e:
+        print(f"[ERROR] Symptom suggester refresh failed, keeping the previous one: {e}")
+        with _suggester_lock:
+            _built_at = time.monotonic()  # retry after another SUGGESTER_REFRESH
+    finally:
+        with _suggester_lock:
+            _refreshing = False
+
+
+def get_symptom_suggester(config):
+    """Return the process-wide suggester, rebuilt from history every SUGGESTER_REFRESH seconds.
+
+    Only the very first build makes callers wait. Later rebuilds run in a
+    background thread while requests keep using the previous snapshot,
+    which is swapped out once the new one is ready. Must be called inside
+    an app context (history is read from the database).
+    """
+    global _refreshing
+    suggester = _suggester
+    if suggester is None:
+        with _build_lock:
+            if _suggester is None:
+                _install(build_symptom_suggester(config))
+        return _suggester
+
+    with _suggester_lock:
+        start = not _refreshing and time.monotonic() - _built_at >= config.get("SUGGESTER_REFRESH", 300)
+        if start:
+            _refreshing = True
+    if start:
+        threading.Thread(target=_refresh, args=(current_app._get_current_object(),),
+                         name="suggester-refresh", daemon=True).start()
+    return suggester
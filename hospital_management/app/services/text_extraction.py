@@ -0,0 +1,54 @@
+import importlib.util
+import os
+
+TEXT_EXTENSIONS = {"pdf", "docx"}
+
+
+class UnsupportedReport(Exception):
+    """The file type has no text extractor (images, legacy .doc, or pypdf not installed)."""
+
+
+# --------------------------------------------
+# 📄 Plain-text extraction (runs inside worker processes)
+# --------------------------------------------
+# Kept free of Flask/DB imports so worker processes start quickly.
+def extract_docx_text(path):
+    from docx import Document
+
+    doc = Document(path)
+    parts = [para.text for para in doc.paragraphs if para.text.strip()]
+    for table in doc.tables:
+        for row in table.rows:
+            cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+            if cells:
+                parts.append(" | ".join(cells))
+    return "\n".join(parts)
+
+
+def pdf_support_available():
+    return importlib.util.find_spec("pypdf") is not None
+
+
+def extract_pdf_text(path):
+    try:
+        from pypdf import PdfReader  # optional dependency
+    except ImportError:
+        raise UnsupportedReport("PDF text extraction needs the 'pypdf' package")
+
+    reader = PdfReader(path)
+    return "\n".join((page.extract_text() or "") for page in reader.pages)
+
+
+def extract_text(path, max_chars=1_000_000, ext=None):
+    """Return the text of a PDF or DOCX report, truncated to ``max_chars``.
+
+    ``ext`` defaults to the path's extension; content-addressed blobs have none.
+    """
+    ext = ext or os.path.splitext(path)[1].lower().lstrip(".")
+    if ext == "docx":
+        text = extract_docx_text(path)
+    elif ext == "pdf":
+        text = extract_pdf_text(path)
+    else:
+        raise UnsupportedReport(f"No text extractor for .{ext} files")
+    return text[:max_chars]
@@ -0,0 +1,91 @@
+# benchmark_db.py
+#
+# Measures read latency while a writer keeps committing, on a scratch SQLite
+# file, first with SQLite's defaults (rollback journal) and then with the
+# pragmas from app/services/db_engine.py (WAL, synchronous=NORMAL, ...).
+#
+#   python benchmark_db.py [--seconds 5] [--readers 4]
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.services.db_engine import apply_sqlite_pragmas, engine_options
+from config import Config
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(tuned, seconds, readers, rows_per_txn):
+    path = os.path.join(tempfile.mkdtemp(prefix="dbbench-"), "bench.db")
+    config = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+    config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + path
+    if not tuned:
+        config["SQLITE_BUSY_TIMEOUT_MS"] = 30000
+
+    engine = create_engine(config["SQLALCHEMY_DATABASE_URI"], **engine_options(config))
+    if tuned:
+        apply_sqlite_pragmas(engine, config)
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE results (id INTEGER PRIMARY KEY, symptoms TEXT, disease TEXT)"))
+        conn.execute(text("INSERT INTO results (symptoms, disease) VALUES ('fever,cough', 'Influenza')"))
+        conn.execute(text("CREATE INDEX ix_results_disease ON results (disease)"))
+
+    stop = threading.Event()
+    latencies, writes = [], [0]
+
+    def writer():
+        # Write transactions big enough to spill SQLite's page cache (like a report
+        # upload or a history import); in rollback-journal mode that takes the
+        # exclusive lock before commit and readers wait until it is released
+        payload = "x" * 1024
+        while not stop.is_set():
+            with engine.begin() as conn:
+                conn.execute(
+                    text("INSERT INTO results (symptoms, disease) VALUES (:symptoms, 'Dengue')"),
+                    [{"symptoms": payload}] * rows_per_txn,
+                )
+                time.sleep(0.05)
+            writes[0] += rows_per_txn
+
+    def reader():
+        while not stop.is_set():
+            start = time.perf_counter()
+            with engine.connect() as conn:
+                conn.execute(text("SELECT COUNT(*) FROM results WHERE disease = 'Influenza'")).scalar()
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    ms = [v * 1000 for v in latencies]
+    label = "tuned (WAL)" if tuned else "default journal"
+    print(f"{label:16s} reads={len(ms):7d}  p50={percentile(ms, 50):7.2f} ms  p99={percentile(ms, 99):8.2f} ms  "
+          f"max={max(ms, default=0):8.2f} ms  rows written={writes[0]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite read latency under concurrent writes")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--rows-per-txn", type=int, default=5000)
+    args = parser.parse_args()
+
+    run(False, args.seconds, args.readers, args.rows_per_txn)
+    run(True, args.seconds, args.readers, args.rows_per_txn)
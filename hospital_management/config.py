@@ -5,14 +5,82 @@ BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'your_secret_key_here')
     
-    # SQLite database
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(BASE_DIR, 'hospital.db')
+    # Database: SQLite by default, or a server database via DATABASE_URL
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///' + os.path.join(BASE_DIR, 'hospital.db'))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # seconds, server databases only
+
+    # SQLite tuning (applied to every new connection)
+    SQLITE_WAL = os.environ.get('SQLITE_WAL', '1') != '0'
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # bytes
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))
 
     # File upload configuration
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'uploads')
     ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'png', 'jpg', 'jpeg'}
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB upload limit
 
+    # Report storage: content-addressed blobs, local disk or an object store
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'local')  # local | object
+    STORAGE_ROOT = os.environ.get('STORAGE_ROOT', os.path.join(UPLOAD_FOLDER, 'store'))
+    STORAGE_CHUNK_SIZE = int(os.environ.get('STORAGE_CHUNK_SIZE', 1024 * 1024))  # bytes
+    OBJECT_STORE_DIR = os.environ.get('OBJECT_STORE_DIR', os.path.join(BASE_DIR, 'object_store'))  # local stand-in
+    OBJECT_STORE_BUCKET = os.environ.get('OBJECT_STORE_BUCKET', 'reports')
+
+    # Report downloads: python streams with Range support; x-accel / x-sendfile hand off to the proxy
+    REPORT_DELIVERY = os.environ.get('REPORT_DELIVERY', 'python')  # python | x-accel | x-sendfile
+    REPORT_ACCEL_ROOT = os.environ.get('REPORT_ACCEL_ROOT', UPLOAD_FOLDER)  # maps to REPORT_ACCEL_PREFIX in nginx
+    REPORT_ACCEL_PREFIX = os.environ.get('REPORT_ACCEL_PREFIX', '/protected-reports/')
+
+    # Rendered DOCX previews (content-addressed, LRU-evicted)
+    REPORT_HTML_CACHE_DIR = os.environ.get('REPORT_HTML_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'report_html'))
+    REPORT_HTML_CACHE_MAX_BYTES = int(os.environ.get('REPORT_HTML_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+    # Speech-to-text decode pool (Vosk)
+    SPEECH_SAMPLE_RATE = int(os.environ.get('SPEECH_SAMPLE_RATE', 16000))  # uploads are resampled to this
+    SPEECH_WORKERS = int(os.environ.get('SPEECH_WORKERS', 2))
+    SPEECH_QUEUE_SIZE = int(os.environ.get('SPEECH_QUEUE_SIZE', 8))
+    SPEECH_TIMEOUT = float(os.environ.get('SPEECH_TIMEOUT', 120))  # seconds
+    SPEECH_MAX_STREAMS = int(os.environ.get('SPEECH_MAX_STREAMS', 8))
+    SPEECH_STREAM_IDLE_TIMEOUT = float(os.environ.get('SPEECH_STREAM_IDLE_TIMEOUT', 30))  # seconds
+
+    # Disease prediction
+    PREDICTOR_BACKEND = os.environ.get('PREDICTOR_BACKEND', 'forest')  # forest | rules | ensemble
+    PREDICTOR_ENSEMBLE_FOREST_WEIGHT = float(os.environ.get('PREDICTOR_ENSEMBLE_FOREST_WEIGHT', 0.7))
+    PREDICT_BATCH_MAX_ROWS = int(os.environ.get('PREDICT_BATCH_MAX_ROWS', 10000))
+    PREDICT_MICROBATCH_WAIT_MS = float(os.environ.get('PREDICT_MICROBATCH_WAIT_MS', 2))  # 0 disables
+    PREDICT_MICROBATCH_MAX = int(os.environ.get('PREDICT_MICROBATCH_MAX', 64))
+    PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 1024))
+    PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 600))  # seconds
+
+    # Background prediction history writer
+    PREDICTION_WRITER_ENABLED = os.environ.get('PREDICTION_WRITER_ENABLED', '1') != '0'  # 0 writes inline
+    PREDICTION_WRITER_QUEUE = int(os.environ.get('PREDICTION_WRITER_QUEUE', 10000))
+    PREDICTION_WRITER_BATCH = int(os.environ.get('PREDICTION_WRITER_BATCH', 500))
+    PREDICTION_WRITER_INTERVAL = float(os.environ.get('PREDICTION_WRITER_INTERVAL', 0.5))  # seconds
+    PREDICTION_WRITER_ON_FULL = os.environ.get('PREDICTION_WRITER_ON_FULL', 'drop')  # drop | sync
+
+    # Report text extraction (process pool, see report_ingest.py)
+    REPORT_EXTRACT_WORKERS = int(os.environ.get('REPORT_EXTRACT_WORKERS', 2))
+    REPORT_TEXT_MAX_CHARS = int(os.environ.get('REPORT_TEXT_MAX_CHARS', 1000000))
+
+    # OpenRouter LLM client (symptom suggestions)
+    OPENROUTER_BASE_URL = os.environ.get('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1')
+    OPENROUTER_MODEL = os.environ.get('OPENROUTER_MODEL', 'openai/gpt-3.5-turbo')
+    LLM_CONNECT_TIMEOUT = float(os.environ.get('LLM_CONNECT_TIMEOUT', 3.05))  # seconds
+    LLM_READ_TIMEOUT = float(os.environ.get('LLM_READ_TIMEOUT', 20))  # seconds
+    LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 2))
+    LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 8))
+    LLM_CACHE_TTL = float(os.environ.get('LLM_CACHE_TTL', 3600))  # seconds
+    LLM_CACHE_SIZE = int(os.environ.get('LLM_CACHE_SIZE', 512))
+    SUGGEST_LLM_BUDGET = float(os.environ.get('SUGGEST_LLM_BUDGET', 4))  # seconds before falling back to local
+    SUGGESTER_REFRESH = float(os.environ.get('SUGGESTER_REFRESH', 300))  # seconds between co-occurrence rebuilds
+    SUGGESTER_HISTORY_LIMIT = int(os.environ.get('SUGGESTER_HISTORY_LIMIT', 50000))
+
     # Debug mode
     DEBUG = True
\ No newline at end of file
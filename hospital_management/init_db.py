@@ -1,11 +1,16 @@
+import os
 from app import create_app, db
 from app.models.user import User
+from app.services.prediction_history import import_legacy_json_history
+from app.services.report_search import create_search_index
 from werkzeug.security import generate_password_hash
 
 app = create_app()
 
 with app.app_context():
     db.create_all()
+    with db.engine.begin() as connection:
+        create_search_index(connection)
     print(" Tables created successfully!")
 
     # Check if default admin already exists
@@ -20,3 +25,8 @@ with app.app_context():
         print(" Default admin user created! (username: admin123, password: adminpass)")
     else:
         print(" Default admin user already exists.")
+
+    # Move any history from the old prediction_history.json into prediction_results
+    imported = import_legacy_json_history(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prediction_history.json'))
+    if imported:
+        print(f" Imported {imported} legacy prediction history records.")
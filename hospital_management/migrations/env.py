@@ -51,6 +51,19 @@ def get_metadata():
     return target_db.metadata
 
 
+# The FTS5 report search index (app/services/report_search.py) and its shadow
+# tables are managed by hand, not by the models: keep autogenerate off them
+SEARCH_INDEX_TABLES = {'report_search'} | {
+    f'report_search_{suffix}' for suffix in ('data', 'idx', 'content', 'docsize', 'config')
+}
+
+
+def include_name(name, type_, parent_names):
+    if type_ == 'table':
+        return name not in SEARCH_INDEX_TABLES
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +78,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_name=include_name
     )
 
     with context.begin_transaction():
@@ -100,6 +114,7 @@ def run_migrations_online():
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
+            include_name=include_name,
             **conf_args
         )
 
@@ -0,0 +1,81 @@
+"""baseline schema
+
+Creates the tables that existed before migrations were tracked. Existing
+databases (created with db.create_all) already have some or all of them,
+so every table is only created when missing.
+
+Revision ID: 3f1c2a9b7d10
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9b7d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('user'):
+        op.create_table(
+            'user',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=100), nullable=False),
+            sa.Column('password', sa.String(length=100), nullable=False),
+            sa.Column('role', sa.String(length=20), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('username')
+        )
+
+    if not _has_table('appointment'):
+        op.create_table(
+            'appointment',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('patient_id', sa.Integer(), nullable=False),
+            sa.Column('doctor_id', sa.Integer(), nullable=False),
+            sa.Column('date', sa.DateTime(), nullable=False),
+            sa.Column('reason', sa.String(length=255), nullable=False),
+            sa.ForeignKeyConstraint(['doctor_id'], ['user.id']),
+            sa.ForeignKeyConstraint(['patient_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if not _has_table('medical_report'):
+        op.create_table(
+            'medical_report',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('filename', sa.String(length=255), nullable=False),
+            sa.Column('upload_date', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    if not _has_table('prediction_results'):
+        op.create_table(
+            'prediction_results',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('symptoms', sa.Text(), nullable=False),
+            sa.Column('disease', sa.String(length=100), nullable=True),
+            sa.Column('tests', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('prediction_results')
+    op.drop_table('medical_report')
+    op.drop_table('appointment')
+    op.drop_table('user')
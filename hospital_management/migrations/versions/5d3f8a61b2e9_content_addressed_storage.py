@@ -0,0 +1,45 @@
+"""Content-addressed report storage columns
+
+Existing reports keep storage_key NULL and are still read from UPLOAD_FOLDER;
+`flask store-legacy-uploads` moves them into the content-addressed store.
+
+Revision ID: 5d3f8a61b2e9
+Revises: e7a2b5c90d14
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d3f8a61b2e9'
+down_revision = 'e7a2b5c90d14'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = [
+    sa.Column('storage_key', sa.String(length=80), nullable=True),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('size', sa.Integer(), nullable=True),
+    sa.Column('content_type', sa.String(length=100), nullable=True),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = {c['name'] for c in inspector.get_columns('medical_report')}
+    with op.batch_alter_table('medical_report') as batch_op:
+        for column in COLUMNS:
+            if column.name not in existing:
+                batch_op.add_column(column)
+    if 'ix_medical_report_storage_key' not in {i['name'] for i in inspector.get_indexes('medical_report')}:
+        op.create_index('ix_medical_report_storage_key', 'medical_report', ['storage_key'])
+
+
+def downgrade():
+    op.drop_index('ix_medical_report_storage_key', table_name='medical_report')
+    with op.batch_alter_table('medical_report') as batch_op:
+        for column in reversed(COLUMNS):
+            batch_op.drop_column(column.name)
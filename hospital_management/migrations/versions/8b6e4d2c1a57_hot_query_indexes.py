@@ -0,0 +1,52 @@
+"""indexes for the hot query columns
+
+Composite indexes follow the access paths: filter on the owner column,
+then order by the date column. Indexes that db.create_all already made
+are left alone.
+
+Revision ID: 8b6e4d2c1a57
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-18 09:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b6e4d2c1a57'
+down_revision = '3f1c2a9b7d10'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_user_role', 'user', ['role']),
+    ('ix_appointment_doctor_date', 'appointment', ['doctor_id', 'date']),
+    ('ix_appointment_patient_date', 'appointment', ['patient_id', 'date']),
+    ('ix_appointment_date', 'appointment', ['date']),
+    ('ix_medical_report_user_upload', 'medical_report', ['user_id', 'upload_date']),
+    ('ix_medical_report_upload_date', 'medical_report', ['upload_date']),
+    ('ix_medical_report_filename', 'medical_report', ['filename']),
+    ('ix_prediction_results_created_id', 'prediction_results', ['created_at', 'id']),
+    ('ix_prediction_results_user_created', 'prediction_results', ['user_id', 'created_at', 'id']),
+    ('ix_prediction_results_disease_created', 'prediction_results', ['disease', 'created_at', 'id']),
+]
+
+
+def _existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    existing = {}
+    for name, table, columns in INDEXES:
+        if table not in existing:
+            existing[table] = _existing_indexes(table)
+        if name not in existing[table]:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,37 @@
+"""Refcounts for content-addressed report blobs
+
+Backfilled from the reports that already point at each storage_key.
+
+Revision ID: a1c7e3f05b92
+Revises: 5d3f8a61b2e9
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c7e3f05b92'
+down_revision = '5d3f8a61b2e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('stored_blob'):
+        return
+    op.create_table(
+        'stored_blob',
+        sa.Column('storage_key', sa.String(length=80), nullable=False),
+        sa.Column('refcount', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('storage_key'),
+    )
+    op.execute(
+        "INSERT INTO stored_blob (storage_key, refcount) "
+        "SELECT storage_key, COUNT(*) FROM medical_report WHERE storage_key IS NOT NULL GROUP BY storage_key"
+    )
+
+
+def downgrade():
+    op.drop_table('stored_blob')
@@ -0,0 +1,31 @@
+"""FTS5 trigram search index for medical reports
+
+SQLite only: other databases keep the ILIKE fallback in report_search.py.
+
+Revision ID: c4d9e1f27a3b
+Revises: 8b6e4d2c1a57
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d9e1f27a3b'
+down_revision = '8b6e4d2c1a57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite' or sa.inspect(bind).has_table('report_search'):
+        return
+    op.execute("CREATE VIRTUAL TABLE report_search USING fts5(filename, content, tokenize='trigram')")
+    op.execute("INSERT INTO report_search (rowid, filename, content) SELECT id, filename, '' FROM medical_report")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS report_search")
@@ -0,0 +1,40 @@
+"""Extracted text and detected symptoms on medical_report
+
+Existing reports start as 'pending'; run `flask extract-reports` to backfill them.
+
+Revision ID: e7a2b5c90d14
+Revises: c4d9e1f27a3b
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2b5c90d14'
+down_revision = 'c4d9e1f27a3b'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = [
+    sa.Column('content_text', sa.Text(), nullable=True),
+    sa.Column('extraction_status', sa.String(length=20), nullable=True, server_default='pending'),
+    sa.Column('detected_symptoms', sa.Text(), nullable=True),
+    sa.Column('extracted_at', sa.DateTime(), nullable=True),
+]
+
+
+def upgrade():
+    existing = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('medical_report')}
+    with op.batch_alter_table('medical_report') as batch_op:
+        for column in COLUMNS:
+            if column.name not in existing:
+                batch_op.add_column(column)
+
+
+def downgrade():
+    with op.batch_alter_table('medical_report') as batch_op:
+        for column in reversed(COLUMNS):
+            batch_op.drop_column(column.name)
@@ -1,6 +1,8 @@
 from app import create_app
 
-app = create_app()
+# Module-level app for `gunicorn run:app` / `flask --app run`. Report-extraction
+# workers (spawn) re-import this module as __mp_main__ and must not build it.
+app = create_app() if __name__ != '__mp_main__' else None
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,28 @@
+import pytest
+from flask import Flask
+
+from app import db
+from app.services import report_search
+
+
+@pytest.fixture
+def db_app(monkeypatch):
+    """Bare app on an in-memory SQLite database with the full schema and search index.
+
+    Only the extension and the models are set up: no blueprints, speech
+    model or background workers.
+    """
+    app = Flask("hospital_management_tests")
+    app.config.update(SQLALCHEMY_DATABASE_URI="sqlite://", TESTING=True)
+    db.init_app(app)
+    # search_index_available() caches its answer per process
+    monkeypatch.setattr(report_search, "_available", None)
+
+    with app.app_context():
+        from app.models import user, appointment, report, prediction_result  # noqa: F401
+        db.create_all()
+        with db.engine.begin() as connection:
+            report_search.create_search_index(connection)
+        yield app
+        db.session.remove()
+        db.drop_all()
@@ -0,0 +1,52 @@
+import struct
+
+import pytest
+
+from app.services.audio import WAVE_FORMAT_PCM, AudioFormatError, parse_wav, to_pcm16_mono
+
+
+def wav(fmt_body, data=b"", fmt_size=None):
+    fmt_size = len(fmt_body) if fmt_size is None else fmt_size
+    chunks = b"fmt " + struct.pack("<I", fmt_size) + fmt_body
+    chunks += b"data" + struct.pack("<I", len(data)) + data
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks
+
+
+def fmt(format_tag=WAVE_FORMAT_PCM, channels=1, rate=16000, bits=16):
+    block = channels * bits // 8
+    return struct.pack("<HHIIHH", format_tag, channels, rate, rate * block, block, bits)
+
+
+def test_parses_pcm16_mono_without_copying():
+    data = struct.pack("<4h", 0, 1000, -1000, 0)
+    audio = parse_wav(wav(fmt(), data))
+
+    assert audio.is_pcm16_mono
+    assert audio.frames.tobytes() == data
+    assert to_pcm16_mono(audio, 16000)[1].tobytes() == data
+
+
+@pytest.mark.parametrize("buffer", [
+    b"",
+    b"RIFF\0\0\0\0WAVE",
+    b"RIFF\0\0\0\0WAVEfmt \x10\0\0\0",  # fmt chunk cut off after its size
+    b"RIFF\0\0\0\0WAVEfmt \x10\0\0\0\x01\0\x01\0",
+    wav(fmt()[:14], fmt_size=14),
+    wav(fmt(channels=0)),
+    wav(fmt(bits=0)),
+    wav(fmt(rate=0)),
+    wav(fmt(bits=12)),
+    wav(fmt(format_tag=0x0055)),  # MP3 in a WAV container
+], ids=["empty", "no-chunks", "truncated-fmt", "half-fmt", "short-fmt", "zero-channels",
+        "zero-bits", "zero-rate", "odd-bits", "unsupported-codec"])
+def test_malformed_headers_raise_audio_format_error(buffer):
+    with pytest.raises(AudioFormatError):
+        parse_wav(buffer)
+
+
+def test_truncated_extensible_header_is_rejected():
+    body = fmt(format_tag=0xFFFE) + b"\x16\0"  # cbSize, then the file ends
+    buffer = b"RIFF\0\0\0\0WAVEfmt " + struct.pack("<I", 40) + body
+
+    with pytest.raises(AudioFormatError):
+        parse_wav(buffer)
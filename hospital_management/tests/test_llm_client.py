@@ -0,0 +1,130 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.llm_client import LLMError, OpenRouterClient
+
+
+# --------------------------------
+# 🧪 Stub chat-completions server: counts calls, holds answers until released
+# --------------------------------
+class StubLLM:
+    def __init__(self):
+        self.calls = 0
+        self.status = 200
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                with stub._lock:
+                    stub.calls += 1
+                stub.release.wait(timeout=5)
+                body = json.dumps({"choices": [{"message": {"content": "1. Chills\n2. Muscle ache"}}]}).encode()
+                if stub.status != 200:
+                    body = b""
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+@pytest.fixture
+def stub_llm():
+    stub = StubLLM()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), stub.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield stub
+    stub.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def concurrent_completes(client, n, cache_key="fever and cough"):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(client.complete("suggest symptoms", cache_key))
+        except LLMError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out waiting for the client"
+        time.sleep(0.01)
+
+
+def test_concurrent_identical_requests_share_one_upstream_call(stub_llm):
+    client = OpenRouterClient("test", base_url=stub_llm.base_url, max_retries=0)
+    threads, results, errors = concurrent_completes(client, 10)
+
+    # Hold the leader's answer until every follower has joined it
+    wait_for(lambda: client.snapshot()["coalesced"] == 9)
+    stub_llm.release.set()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert stub_llm.calls == 1
+    assert errors == []
+    assert results == ["1. Chills\n2. Muscle ache"] * 10
+    assert client.snapshot()["in_flight"] == 0
+
+    # Answered from the cache afterwards
+    assert client.complete("suggest symptoms", "fever and cough") == results[0]
+    assert stub_llm.calls == 1
+
+
+def test_leader_failure_reaches_every_follower_and_is_not_cached(stub_llm):
+    stub_llm.status = 400  # not retryable
+    client = OpenRouterClient("test", base_url=stub_llm.base_url, max_retries=0)
+    threads, results, errors = concurrent_completes(client, 5)
+
+    wait_for(lambda: client.snapshot()["coalesced"] == 4)
+    stub_llm.release.set()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert stub_llm.calls == 1
+    assert results == []
+    assert [e.status_code for e in errors] == [400] * 5
+    assert client.snapshot()["in_flight"] == 0
+
+    stub_llm.status = 200
+    assert client.complete("suggest symptoms", "fever and cough") == "1. Chills\n2. Muscle ache"
+    assert stub_llm.calls == 2
+
+
+def test_different_inputs_are_not_coalesced(stub_llm):
+    stub_llm.release.set()
+    client = OpenRouterClient("test", base_url=stub_llm.base_url, max_retries=0)
+
+    client.complete("suggest symptoms", "fever")
+    client.complete("suggest symptoms", "cough")
+
+    assert stub_llm.calls == 2
+    assert client.snapshot()["coalesced"] == 0
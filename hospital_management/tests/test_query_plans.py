@@ -0,0 +1,56 @@
+from app import db
+from app.services.query_plans import check_query_plans, check_query_plans_command, plan_problems
+
+
+def drop_indexes(table):
+    names = db.session.execute(db.text(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"
+    ), {"table": table}).scalars().all()
+    for name in names:
+        db.session.execute(db.text(f"DROP INDEX {name}"))
+    db.session.commit()
+    return names
+
+
+def test_every_hot_query_uses_an_index(db_app):
+    results = check_query_plans()
+
+    assert results
+    assert {name: problems for name, _, problems in results if problems} == {}
+
+
+def test_report_search_goes_through_the_fts_index(db_app):
+    plans = {name: plan for name, plan, _ in check_query_plans()}
+
+    assert any("report_search" in detail for detail in plans["report search of a user"])
+
+
+def test_missing_indexes_are_reported(db_app):
+    assert drop_indexes("prediction_results")
+
+    failing = {name for name, _, problems in check_query_plans() if problems}
+
+    assert {"prediction history", "prediction history of a user", "prediction history of a disease"} <= failing
+    assert not any(name.startswith("report") for name in failing)
+
+
+def test_cli_passes_on_the_full_schema(db_app):
+    result = db_app.test_cli_runner().invoke(check_query_plans_command)
+
+    assert result.exit_code == 0
+    assert "Every hot query uses an index" in result.output
+
+
+def test_cli_fails_when_a_query_scans_the_table(db_app):
+    assert drop_indexes("appointment")
+    result = db_app.test_cli_runner().invoke(check_query_plans_command)
+
+    assert result.exit_code != 0
+    assert "[FAIL] appointments of a doctor" in result.output
+
+
+def test_plan_problems():
+    assert plan_problems(["SCAN medical_report"]) == ["SCAN medical_report"]
+    assert plan_problems(["SCAN medical_report USING INDEX ix_medical_report_upload_date"]) == []
+    assert plan_problems(["USE TEMP B-TREE FOR ORDER BY"]) == ["USE TEMP B-TREE FOR ORDER BY"]
+    assert plan_problems(["USE TEMP B-TREE FOR ORDER BY"], allow_sort=True) == []
@@ -0,0 +1,104 @@
+import io
+
+import pytest
+
+from app import db
+from app.models.report import MedicalReport, StoredBlob
+from app.services import storage as storage_module
+from app.services.storage import (
+    LocalStorage, purge_blob, purge_blobs_command, release_blob, store_report_file
+)
+
+
+@pytest.fixture
+def storage(db_app, tmp_path, monkeypatch):
+    db_app.config["STORAGE_ROOT"] = str(tmp_path / "store")
+    monkeypatch.setattr(storage_module, "_storage", None)
+    return storage_module.get_storage(db_app.config)
+
+
+def add_report(storage, data=b"same bytes"):
+    report = MedicalReport(user_id=1, filename="lab.pdf")
+    store_report_file(report, io.BytesIO(data), storage)
+    db.session.add(report)
+    db.session.commit()
+    return report
+
+
+def refcount(key):
+    return db.session.get(StoredBlob, key).refcount
+
+
+def test_identical_uploads_share_one_blob(storage):
+    first, second = add_report(storage), add_report(storage)
+
+    assert first.storage_key == second.storage_key
+    assert refcount(first.storage_key) == 2
+    assert not release_blob(first.storage_key)
+    assert release_blob(first.storage_key)
+
+
+def test_rolled_back_delete_keeps_the_file(storage):
+    report = add_report(storage)
+    key = report.storage_key
+
+    db.session.delete(report)
+    assert release_blob(key)
+    db.session.rollback()  # e.g. the commit failed
+
+    assert storage.exists(key)
+    assert refcount(key) == 1
+    assert db.session.get(MedicalReport, report.id) is not None
+
+
+def test_purge_after_commit_removes_the_blob(storage):
+    report = add_report(storage)
+    key = report.storage_key
+
+    db.session.delete(report)
+    assert release_blob(key)
+    db.session.commit()
+    assert storage.exists(key)  # still there until the purge
+
+    assert purge_blob(key, storage)
+    assert not storage.exists(key)
+    assert db.session.get(StoredBlob, key) is None
+
+
+def test_purge_skips_a_blob_that_was_reused(storage):
+    report = add_report(storage)
+    key = report.storage_key
+    db.session.delete(report)
+    release_blob(key)
+    db.session.commit()
+
+    add_report(storage)  # same content uploaded before the purge ran
+
+    assert not purge_blob(key, storage)
+    assert storage.exists(key)
+    assert refcount(key) == 1
+
+
+def test_purge_blobs_command_removes_orphans(db_app, storage):
+    kept = add_report(storage, b"kept").storage_key
+    orphan = add_report(storage, b"orphan")
+    key = orphan.storage_key
+    db.session.delete(orphan)
+    release_blob(key)
+    db.session.commit()
+
+    result = db_app.test_cli_runner().invoke(purge_blobs_command)
+
+    assert "Purged 1 unreferenced blobs" in result.output
+    assert not storage.exists(key)
+    assert storage.exists(kept)
+
+
+def test_local_storage_is_content_addressed(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    tmp, key, digest, size = storage.stage(io.BytesIO(b"abc"))
+
+    assert key == f"{digest[:2]}/{digest[2:4]}/{digest}"
+    assert size == 3
+    assert storage.put_file(tmp, key)
+    assert storage.exists(key)
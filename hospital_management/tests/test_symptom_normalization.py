@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from app.services import predictor_engine
+from app.services.disease_predictor import load_predictor
+from app.services.predictor_engine import get_predictor_engine, model_vocabulary
+from app.services.symptom_extractor import SymptomLexicon
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def lexicon(tmp_path, monkeypatch):
+    lexicon = SymptomLexicon(str(tmp_path / "known_symptoms.json"))
+    monkeypatch.setattr(predictor_engine, "symptom_lexicon", lexicon)
+    monkeypatch.setattr(predictor_engine, "_engine", None)
+    return lexicon
+
+
+@pytest.fixture
+def predictor():
+    return load_predictor(os.path.join(ROOT, "disease_model.joblib"),
+                          os.path.join(ROOT, "symptom_encoder.joblib"),
+                          os.path.join(ROOT, "disease_forest.bin"))
+
+
+@pytest.mark.parametrize("backend", ["forest", "rules", "ensemble"])
+def test_normalization_is_the_same_before_and_after_the_engine_loads(lexicon, predictor, backend):
+    # As ai_controller does at import time
+    lexicon.reserve(model_vocabulary(predictor))
+    phrases = ["breathlessness", "Stomach ache", "high temperature", "chest pain"]
+    before = [lexicon.normalize(p.lower()) for p in phrases]
+
+    engine = get_predictor_engine(predictor, {"PREDICTOR_BACKEND": backend})
+
+    assert engine.normalize(phrases) == before
+    assert [lexicon.normalize(p.lower()) for p in phrases] == before
+    assert before == ["breathlessness", "abdominal pain", "fever", "chest pain"]
+
+
+def test_model_vocabulary_covers_every_backend(predictor):
+    vocabulary = set(model_vocabulary(predictor))
+
+    assert set(predictor.symptoms) <= vocabulary
+    assert set(predictor_engine.SYMPTOM_DISEASES) <= vocabulary
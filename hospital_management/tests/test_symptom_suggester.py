@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from app.services import symptom_suggester
+from app.services.symptom_suggester import CooccurrenceSuggester, get_symptom_suggester
+
+SETS = [
+    ["fever", "cough", "fatigue"],
+    ["fever", "cough"],
+    ["fever", "chills"],
+    ["headache", "nausea"],
+]
+
+
+def test_suggests_by_cooccurrence():
+    suggester = CooccurrenceSuggester(SETS)
+
+    assert suggester.suggest(["cough"]) == ["fever", "fatigue"]
+    assert suggester.suggest(["Fever "], k=1) == ["cough"]
+    assert suggester.suggest(["unknown"]) == []
+    assert suggester.suggest_for_text("I have a high temperature") == ["cough", "chills", "fatigue"]
+
+
+@pytest.fixture
+def fresh_suggester(monkeypatch):
+    monkeypatch.setattr(symptom_suggester, "_suggester", None)
+    monkeypatch.setattr(symptom_suggester, "_built_at", 0.0)
+    monkeypatch.setattr(symptom_suggester, "_refreshing", False)
+
+
+def test_refresh_runs_in_the_background(db_app, fresh_suggester, monkeypatch):
+    release = threading.Event()
+    builds = []
+
+    def build(config):
+        if builds:
+            release.wait(timeout=5)  # the refresh is slow
+        builds.append(CooccurrenceSuggester(SETS[:len(builds) + 1]))
+        return builds[-1]
+
+    monkeypatch.setattr(symptom_suggester, "build_symptom_suggester", build)
+    config = {"SUGGESTER_REFRESH": 0.05}
+
+    first = get_symptom_suggester(config)
+    assert first is builds[0]
+
+    time.sleep(0.06)
+    started = time.monotonic()
+    for _ in range(5):
+        # Stale, but readers keep the old snapshot instead of waiting for the rebuild
+        assert get_symptom_suggester(config) is first
+    assert time.monotonic() - started < 1.0
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while get_symptom_suggester(config) is first:
+        assert time.monotonic() < deadline, "refreshed suggester was never installed"
+        time.sleep(0.01)
+    assert len(builds) == 2  # one refresh, however many callers saw the stale one
+
+
+def test_failed_refresh_keeps_the_previous_suggester(db_app, fresh_suggester, monkeypatch):
+    calls = []
+
+    def build(config):
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("database unavailable")
+        return CooccurrenceSuggester(SETS)
+
+    monkeypatch.setattr(symptom_suggester, "build_symptom_suggester", build)
+    config = {"SUGGESTER_REFRESH": 0.05}
+    first = get_symptom_suggester(config)
+
+    time.sleep(0.06)
+    assert get_symptom_suggester(config) is first
+    deadline = time.monotonic() + 5
+    while symptom_suggester._refreshing:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert get_symptom_suggester(config) is first
+    assert len(calls) == 2
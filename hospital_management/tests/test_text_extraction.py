@@ -0,0 +1,65 @@
+import pytest
+from docx import Document
+
+from app.services.text_extraction import UnsupportedReport, extract_text, pdf_support_available
+
+
+def minimal_pdf(text):
+    content = b"BT /F1 12 Tf 72 720 Td (" + text.encode("latin-1") + b") Tj ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R"
+        b" /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+def test_pdf_support_is_installed():
+    # pypdf is in requirements.txt; without it every PDF report stays unsearchable
+    assert pdf_support_available()
+
+
+def test_extracts_pdf_text(tmp_path):
+    path = tmp_path / "lab.pdf"
+    path.write_bytes(minimal_pdf("Hemoglobin low, fever and cough"))
+
+    assert extract_text(str(path)) == "Hemoglobin low, fever and cough"
+
+
+def test_extracts_docx_paragraphs_and_tables(tmp_path):
+    doc = Document()
+    doc.add_paragraph("Patient reports headache.")
+    table = doc.add_table(rows=1, cols=2)
+    table.cell(0, 0).text, table.cell(0, 1).text = "Hemoglobin", "13.2"
+    path = tmp_path / "notes.docx"
+    doc.save(path)
+
+    assert extract_text(str(path)) == "Patient reports headache.\nHemoglobin | 13.2"
+
+
+def test_content_addressed_blobs_pass_the_extension(tmp_path):
+    path = tmp_path / "ab" / "cd" / "abcd1234"
+    path.parent.mkdir(parents=True)
+    path.write_bytes(minimal_pdf("fever"))
+
+    assert extract_text(str(path), ext="pdf") == "fever"
+    assert extract_text(str(path), max_chars=3, ext="pdf") == "fev"
+
+
+def test_images_are_unsupported(tmp_path):
+    path = tmp_path / "scan.png"
+    path.write_bytes(b"\x89PNG")
+
+    with pytest.raises(UnsupportedReport):
+        extract_text(str(path))
@@ -1,10 +1,7 @@
 # train_model.py
 
-import joblib
 import json
 import os
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import MultiLabelBinarizer
 
 # ✅ Save models in the same folder as this script
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -49,30 +46,47 @@ samples = [
     (["seizures", "confusion", "staring spells"], "Epilepsy"),
 ]
 
-# 2️⃣ Prepare features and labels
-X_symptoms = [s[0] for s in samples]
-y_disease = [s[1] for s in samples]
+def train():
+    # ✅ Heavy imports stay here so the app can import `samples` without scikit-learn
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import MultiLabelBinarizer
 
-# 3️⃣ Encode features
-mlb = MultiLabelBinarizer()
-X_encoded = mlb.fit_transform(X_symptoms)
+    from app.services.compiled_forest import export_compiled_forest
 
-# 4️⃣ Train model
-clf = RandomForestClassifier(n_estimators=100, random_state=42)
-clf.fit(X_encoded, y_disease)
+    # 2️⃣ Prepare features and labels
+    X_symptoms = [s[0] for s in samples]
+    y_disease = [s[1] for s in samples]
 
-# 5️⃣ Save model and symptom encoder in the same directory as this script
-joblib.dump(clf, os.path.join(BASE_DIR, "disease_model.joblib"))
-joblib.dump(mlb, os.path.join(BASE_DIR, "symptom_encoder.joblib"))
+    # 3️⃣ Encode features
+    mlb = MultiLabelBinarizer()
+    X_encoded = mlb.fit_transform(X_symptoms)
 
-# 6️⃣ Save valid symptoms for UI checkboxes
-with open(os.path.join(BASE_DIR, "valid_symptoms.json"), "w") as f:
-    json.dump(mlb.classes_.tolist(), f, indent=4)
+    # 4️⃣ Train model
+    clf = RandomForestClassifier(n_estimators=100, random_state=42)
+    clf.fit(X_encoded, y_disease)
 
-# ✅ Final Console Outputs
-print("\n[✔] Model and encoder saved:")
-print(f"    → {os.path.join(BASE_DIR, 'disease_model.joblib')}")
-print(f"    → {os.path.join(BASE_DIR, 'symptom_encoder.joblib')}")
-print("[🧠] Symptoms used for prediction:")
-print("     ", mlb.classes_.tolist())
-print("[📁] Symptoms list saved to valid_symptoms.json")
\ No newline at end of file
+    # 5️⃣ Save model and symptom encoder in the same directory as this script
+    joblib.dump(clf, os.path.join(BASE_DIR, "disease_model.joblib"))
+    joblib.dump(mlb, os.path.join(BASE_DIR, "symptom_encoder.joblib"))
+
+    # 6️⃣ Save valid symptoms for UI checkboxes
+    with open(os.path.join(BASE_DIR, "valid_symptoms.json"), "w") as f:
+        json.dump(mlb.classes_.tolist(), f, indent=4)
+
+    # 7️⃣ Compile the forest into flat, memory-mappable arrays for fast inference
+    export_compiled_forest(clf, mlb.classes_.tolist(), os.path.join(BASE_DIR, "disease_forest.bin"))
+
+    # ✅ Final Console Outputs
+    print("\n[✔] Model and encoder saved:")
+    print(f"    → {os.path.join(BASE_DIR, 'disease_model.joblib')}")
+    print(f"    → {os.path.join(BASE_DIR, 'symptom_encoder.joblib')}")
+    print(f"    → {os.path.join(BASE_DIR, 'disease_forest.bin')}")
+    print("[🧠] Symptoms used for prediction:")
+    print("     ", mlb.classes_.tolist())
+    print("[📁] Symptoms list saved to valid_symptoms.json")
+    print("[ℹ️] Restart the app to serve the new model (workers keep the one they loaded).")
+
+
+if __name__ == "__main__":
+    train()